@@ -4,7 +4,9 @@ import os
 # Adiciona o diretório raiz do projeto ao PATH para que as importações funcionem
 sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
 
-from src.main import app as application
+from src.main import app as application, inicializar
+
+inicializar(application)
 
 # Este arquivo é o ponto de entrada para o Vercel
 # O Vercel espera uma variável chamada `application` (ou `app`)
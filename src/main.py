@@ -1,5 +1,6 @@
 import os
 import sys
+import threading
 # DON'T CHANGE THIS !!!
 sys.path.insert(0, os.path.dirname(os.path.dirname(__file__)))
 
@@ -9,7 +10,23 @@ from src.models.user import db
 
 app = Flask(__name__, static_folder=os.path.join(os.path.dirname(__file__), 'static'))
 app.config['SECRET_KEY'] = 'asdf#FGSgvasgf$5$WGT'
-app.config['MAX_CONTENT_LENGTH'] = 16 * 1024 * 1024  # 16MB max file size
+app.config['MAX_CONTENT_LENGTH'] = 512 * 1024 * 1024  # 512MB max file size
+app.config['IMPORT_MAX_IN_MEMORY_SIZE'] = 16 * 1024 * 1024  # acima disso a importação é feita em streaming
+app.config['IMPORT_CHUNK_SIZE'] = 1000  # indicações por commit na importação
+app.config['IMPORT_READ_BATCH'] = 20000  # linhas lidas e validadas por vez nas importações em streaming
+app.config['IMPORT_PHONE_WORKERS'] = 1  # processos para validar telefones (1 = sem paralelismo)
+app.config['IMPORT_JOB_WORKERS'] = 2  # threads para importações em segundo plano
+app.config['IMPORT_JOBS_DIR'] = None  # padrão: diretório temporário do sistema
+app.config['JOB_STALE_AFTER'] = 600  # segundos sem progresso para um job em processamento ser considerado abandonado
+app.config['EXPORT_CACHE_MAX_ENTRIES'] = 32  # arquivos exportados mantidos em memória
+app.config['EXPORT_CACHE_MAX_BYTES'] = 64 * 1024 * 1024  # limite total do cache de exportações
+app.config['RESPONSE_CACHE_TTL'] = 60  # segundos de validade das respostas de dashboard/performance
+app.config['RESPONSE_CACHE_MAX_ENTRIES'] = 256  # respostas mantidas em memória
+app.config['RESPONSE_CACHE_MAX_BYTES'] = 8 * 1024 * 1024  # limite total do cache de respostas
+app.config['EXPORT_JOB_WORKERS'] = 1  # exportações em segundo plano executadas ao mesmo tempo (somando todos os processos)
+app.config['EXPORT_JOB_MAX_QUEUE'] = 10  # exportações pendentes ou em andamento aceitas
+app.config['EXPORT_JOB_TTL'] = 3600  # segundos em que o arquivo gerado fica disponível
+app.config['EXPORT_JOBS_DIR'] = None  # padrão: diretório temporário do sistema
 
 # Habilitar CORS
 CORS(app)
@@ -23,6 +40,12 @@ db.init_app(app)
 from src.models.indicador import Indicador
 from src.models.indicacao import Indicacao
 from src.models.config import Config
+from src.models.import_job import ImportJob
+from src.models.import_fingerprint import ImportArquivo, ImportFingerprint
+from src.models.export_job import ExportJob
+from src.models.rollup_diario import RollupDiario
+from src.models.telefone_busca import TelefoneBusca
+from src.models.migracao import Migracao
 
 # Importar blueprints após a configuração do app
 from src.routes.user import user_bp
@@ -37,9 +60,69 @@ app.register_blueprint(indicacoes_bp, url_prefix='/api')
 app.register_blueprint(import_bp, url_prefix='/api')
 app.register_blueprint(relatorios_bp, url_prefix='/api')
 
-with app.app_context():
+_inicializado = False
+_inicializacao_lock = threading.Lock()
+
+
+def preparar_banco():
+    """Cria tabelas, aplica migrações e popula rollup e índices de busca (no app context)"""
     db.create_all()
 
+    # create_all não altera tabelas existentes: índices e ajustes de schema vêm das migrações
+    from src.services.migracoes import aplicar_migracoes
+    aplicar_migracoes()
+
+    # Versão dos dados compartilhada pelos workers (invalida os caches)
+    from src.services.versao_dados import garantir_versao
+    garantir_versao()
+
+    # Bancos criados antes do rollup diário precisam de uma carga inicial
+    from src.services.rollup import rollup_precisa_reconstrucao, reconstruir_rollup
+    if rollup_precisa_reconstrucao():
+        reconstruir_rollup()
+
+    # Índice de texto completo da busca (SQLite FTS5), populado se estiver vazio
+    from src.services.busca import criar_indice_busca
+    criar_indice_busca()
+
+    # Formas só com dígitos dos telefones, para a busca parcial por telefone
+    from src.services.busca_telefone import telefones_precisam_reconstrucao, reconstruir_telefones
+    if telefones_precisam_reconstrucao():
+        reconstruir_telefones()
+
+
+def inicializar(app, retomar_jobs=True):
+    """Prepara o banco e retoma os jobs em segundo plano, uma vez por processo
+
+    Fica fora do import do módulo: os processos `spawn` do pool de telefones
+    reexecutam o __main__ e não podem repetir migrações nem retomar jobs.
+    Scripts de manutenção passam `retomar_jobs=False`.
+    """
+    global _inicializado
+    with _inicializacao_lock:
+        if _inicializado:
+            return
+
+        with app.app_context():
+            preparar_banco()
+
+            if retomar_jobs:
+                # Retomar importações em segundo plano deixadas por um reinício
+                from src.services.import_jobs import retomar_jobs_pendentes
+                retomar_jobs_pendentes(app)
+
+                # Exportações em segundo plano podem ser refeitas desde o início
+                from src.services.export_jobs import retomar_exportacoes_pendentes
+                retomar_exportacoes_pendentes(app)
+
+        _inicializado = True
+
+
+@app.before_request
+def _inicializar_no_primeiro_request():
+    # Servidores WSGI que importam `app` diretamente (ex.: gunicorn src.main:app)
+    inicializar(app)
+
 @app.route('/', defaults={'path': ''})
 @app.route('/<path:path>')
 def serve(path):
@@ -58,4 +141,5 @@ def serve(path):
 
 
 if __name__ == '__main__':
+    inicializar(app)
     app.run(host='0.0.0.0', port=5000, debug=True)
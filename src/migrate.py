@@ -0,0 +1,53 @@
+#!/usr/bin/env python3
+"""
+Script para aplicar as migrações de schema e conferir os planos das consultas
+"""
+import sys
+import os
+import argparse
+
+# Adiciona o diretório raiz do projeto ao PATH
+sys.path.insert(0, os.path.dirname(os.path.dirname(__file__)))
+
+from src.main import app
+from src.models.user import db
+from src.services.migracoes import aplicar_migracoes
+from src.services.plano_consultas import verificar_planos
+
+def main():
+    """Aplica as migrações pendentes; com --check, falha se alguma consulta lê tabela inteira"""
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument('--check', action='store_true', help='conferir os planos (EXPLAIN) das consultas principais')
+    args = parser.parse_args()
+
+    with app.app_context():
+        print("🔄 Aplicando migrações...")
+        db.create_all()
+        aplicadas = aplicar_migracoes()
+        if aplicadas:
+            for nome in aplicadas:
+                print(f"   • {nome}")
+        print(f"✅ {len(aplicadas)} migração(ões) aplicada(s)")
+
+        if not args.check:
+            return 0
+
+        print("\n🔍 Conferindo planos das consultas principais...")
+        falhas = 0
+        for resultado in verificar_planos():
+            if resultado['varreduras']:
+                falhas += 1
+                print(f"   ❌ {resultado['consulta']}: leitura completa de {', '.join(resultado['varreduras'])}")
+                for linha in resultado['plano']:
+                    print(f"      {linha}")
+            else:
+                print(f"   ✅ {resultado['consulta']}")
+
+        if falhas:
+            print(f"\n❌ {falhas} consulta(s) sem índice adequado")
+            return 1
+        print("\n✅ Todas as consultas usam índices")
+        return 0
+
+if __name__ == "__main__":
+    sys.exit(main())
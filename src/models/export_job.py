@@ -0,0 +1,62 @@
+import uuid
+from datetime import datetime
+from sqlalchemy import Column, String, DateTime, Integer, Text, Enum
+from sqlalchemy.dialects.postgresql import UUID
+from src.models.user import db
+from src.models.import_job import StatusJob
+
+class ExportJob(db.Model):
+    __tablename__ = 'export_jobs'
+
+    id = Column(UUID(as_uuid=True), primary_key=True, default=uuid.uuid4)
+    status = Column(Enum(StatusJob), nullable=False, default=StatusJob.PENDENTE)
+    formato = Column(String(10), nullable=False)  # xlsx, parquet
+    tipo = Column(String(20), nullable=False)  # completo, indicacoes, indicadores
+    data_inicio = Column(String(10), nullable=True)
+    data_fim = Column(String(10), nullable=True)
+    indicador_id = Column(String(36), nullable=True)
+    total_linhas = Column(Integer, nullable=True)
+    linhas_escritas = Column(Integer, default=0)
+    caminho_arquivo = Column(String(1024), nullable=True)
+    nome_arquivo = Column(String(255), nullable=True)
+    mimetype = Column(String(100), nullable=True)
+    erro = Column(Text, nullable=True)
+    expira_em = Column(DateTime, nullable=True)
+    created_at = Column(DateTime, default=datetime.utcnow)
+    updated_at = Column(DateTime, default=datetime.utcnow, onupdate=datetime.utcnow)
+
+    def __repr__(self):
+        return f'<ExportJob {self.id} {self.status.value}>'
+
+    @property
+    def expirado(self):
+        return self.expira_em is not None and self.expira_em <= datetime.utcnow()
+
+    def to_dict(self):
+        total_linhas = self.total_linhas or 0
+        linhas_escritas = self.linhas_escritas or 0
+        if self.status == StatusJob.CONCLUIDO:
+            progresso = 100.0
+        else:
+            progresso = round(min(linhas_escritas / total_linhas * 100, 99.9), 1) if total_linhas else 0.0
+
+        disponivel = self.status == StatusJob.CONCLUIDO and not self.expirado
+        return {
+            'id': str(self.id),
+            'status': self.status.value,
+            'formato': self.formato,
+            'tipo': self.tipo,
+            'data_inicio': self.data_inicio,
+            'data_fim': self.data_fim,
+            'indicador_id': self.indicador_id,
+            'total_linhas': self.total_linhas,
+            'linhas_escritas': linhas_escritas,
+            'progresso': progresso,
+            'nome_arquivo': self.nome_arquivo,
+            'download_url': f'/api/export/jobs/{self.id}/download' if disponivel else None,
+            'expirado': self.expirado,
+            'expira_em': self.expira_em.isoformat() if self.expira_em else None,
+            'erro': self.erro,
+            'created_at': self.created_at.isoformat() if self.created_at else None,
+            'updated_at': self.updated_at.isoformat() if self.updated_at else None
+        }
@@ -0,0 +1,42 @@
+import uuid
+from datetime import datetime
+from sqlalchemy import Column, String, DateTime, Integer, ForeignKey, event
+from sqlalchemy.dialects.postgresql import UUID
+from src.models.user import db
+from src.models.indicacao import Indicacao
+
+class ImportArquivo(db.Model):
+    __tablename__ = 'import_arquivos'
+
+    id = Column(UUID(as_uuid=True), primary_key=True, default=uuid.uuid4)
+    hash = Column(String(64), nullable=False, unique=True)  # SHA-256 do conteúdo
+    nome_arquivo = Column(String(255), nullable=True)
+    importacoes = Column(Integer, default=1)
+    linhas_criadas = Column(Integer, default=0)
+    linhas_ignoradas = Column(Integer, default=0)
+    created_at = Column(DateTime, default=datetime.utcnow)
+    updated_at = Column(DateTime, default=datetime.utcnow, onupdate=datetime.utcnow)
+
+    def __repr__(self):
+        return f'<ImportArquivo {self.nome_arquivo} {self.hash[:12]}>'
+
+class ImportFingerprint(db.Model):
+    __tablename__ = 'import_fingerprints'
+
+    # SHA-1 de telefone do indicador + telefone do indicado + data; a PK é o índice único
+    fingerprint = Column(String(40), primary_key=True)
+    indicacao_id = Column(UUID(as_uuid=True), ForeignKey('indicacoes.id'), nullable=False, index=True)
+    created_at = Column(DateTime, default=datetime.utcnow)
+
+    def __repr__(self):
+        return f'<ImportFingerprint {self.fingerprint}>'
+
+@event.listens_for(Indicacao, 'before_delete')
+def remover_fingerprint(mapper, connection, target):
+    """Indicação excluída pode voltar numa próxima importação
+
+    Antes do DELETE da indicação: a chave estrangeira do fingerprint aponta para ela.
+    """
+    connection.execute(
+        ImportFingerprint.__table__.delete().where(ImportFingerprint.indicacao_id == target.id)
+    )
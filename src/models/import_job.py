@@ -0,0 +1,46 @@
+import uuid
+import json
+from datetime import datetime
+from sqlalchemy import Column, String, DateTime, Integer, Text, Enum
+from sqlalchemy.dialects.postgresql import UUID
+from src.models.user import db
+import enum
+
+class StatusJob(enum.Enum):
+    PENDENTE = "Pendente"
+    PROCESSANDO = "Processando"
+    CONCLUIDO = "Concluido"
+    ERRO = "Erro"
+
+class ImportJob(db.Model):
+    __tablename__ = 'import_jobs'
+
+    id = Column(UUID(as_uuid=True), primary_key=True, default=uuid.uuid4)
+    status = Column(Enum(StatusJob), nullable=False, default=StatusJob.PENDENTE)
+    nome_arquivo = Column(String(255), nullable=False)
+    caminho_arquivo = Column(String(1024), nullable=False)
+    tamanho_chunk = Column(Integer, nullable=False)
+    linhas_processadas = Column(Integer, default=0)
+    linhas_criadas = Column(Integer, default=0)
+    linhas_com_erro = Column(Integer, default=0)
+    relatorio = Column(Text, nullable=True)  # JSON do relatório final
+    erro = Column(Text, nullable=True)
+    created_at = Column(DateTime, default=datetime.utcnow)
+    updated_at = Column(DateTime, default=datetime.utcnow, onupdate=datetime.utcnow)
+
+    def __repr__(self):
+        return f'<ImportJob {self.id} {self.status.value}>'
+
+    def to_dict(self):
+        return {
+            'id': str(self.id),
+            'status': self.status.value,
+            'nome_arquivo': self.nome_arquivo,
+            'linhas_processadas': self.linhas_processadas or 0,
+            'linhas_criadas': self.linhas_criadas or 0,
+            'linhas_com_erro': self.linhas_com_erro or 0,
+            'relatorio': json.loads(self.relatorio) if self.relatorio else None,
+            'erro': self.erro,
+            'created_at': self.created_at.isoformat() if self.created_at else None,
+            'updated_at': self.updated_at.isoformat() if self.updated_at else None
+        }
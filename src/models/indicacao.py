@@ -1,6 +1,6 @@
 import uuid
 from datetime import datetime
-from sqlalchemy import Column, String, DateTime, Boolean, Integer, Text, ForeignKey, Enum
+from sqlalchemy import Column, String, DateTime, Boolean, Integer, Text, ForeignKey, Enum, Index
 from sqlalchemy.dialects.postgresql import UUID
 from src.models.user import db
 import enum
@@ -24,6 +24,15 @@ class Indicacao(db.Model):
     indicador_id = Column(UUID(as_uuid=True), ForeignKey('indicadores.id'), nullable=False)
     created_at = Column(DateTime, default=datetime.utcnow)
     updated_at = Column(DateTime, default=datetime.utcnow, onupdate=datetime.utcnow)
+
+    # Índices pelas consultas da API: a data entra em todos porque listas e
+    # exportações filtram por período e ordenam por (data_indicacao, id)
+    __table_args__ = (
+        Index('ix_indicacoes_data_id', 'data_indicacao', 'id'),
+        Index('ix_indicacoes_indicador_data', 'indicador_id', 'data_indicacao', 'id'),
+        Index('ix_indicacoes_status_data', 'status_recompensa', 'data_indicacao'),
+        Index('ix_indicacoes_venda_data', 'gerou_venda', 'data_indicacao'),
+    )
     
     def __repr__(self):
         return f'<Indicacao {self.nome_indicado}>'
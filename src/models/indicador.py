@@ -1,6 +1,6 @@
 import uuid
 from datetime import datetime
-from sqlalchemy import Column, String, DateTime
+from sqlalchemy import Column, String, DateTime, Index
 from sqlalchemy.dialects.postgresql import UUID
 from src.models.user import db
 
@@ -17,6 +17,12 @@ class Indicador(db.Model):
     
     # Relacionamento com indicações (lazy loading para evitar problemas de importação circular)
     indicacoes = db.relationship('Indicacao', backref='indicador', lazy=True)
+
+    # (telefone, nome) identifica o indicador na importação; (nome, id) ordena as listas
+    __table_args__ = (
+        Index('ix_indicadores_telefone_nome', 'telefone', 'nome'),
+        Index('ix_indicadores_nome_id', 'nome', 'id'),
+    )
     
     def __repr__(self):
         return f'<Indicador {self.nome}>'
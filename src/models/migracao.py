@@ -0,0 +1,13 @@
+from datetime import datetime
+from sqlalchemy import Column, String, DateTime
+from src.models.user import db
+
+class Migracao(db.Model):
+    """Migrações de schema já aplicadas ao banco (ver src/services/migracoes.py)"""
+    __tablename__ = 'schema_migracoes'
+
+    nome = Column(String(100), primary_key=True)
+    aplicada_em = Column(DateTime, default=datetime.utcnow)
+
+    def __repr__(self):
+        return f'<Migracao {self.nome}>'
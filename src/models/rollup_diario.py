@@ -0,0 +1,97 @@
+from collections import defaultdict
+from sqlalchemy import Column, Date, Integer, ForeignKey, Enum, event, and_
+from sqlalchemy.dialects.postgresql import UUID
+from sqlalchemy.orm import attributes
+from src.models.user import db
+from src.models.indicacao import Indicacao, StatusRecompensa
+
+class RollupDiario(db.Model):
+    """Totais de indicações por indicador, dia e status de recompensa
+
+    Mantido incrementalmente pelos eventos de Indicacao e pela importação em
+    lote; pode ser reconstruído com `python src/rebuild_rollup.py`.
+    """
+    __tablename__ = 'rollup_indicacoes_diario'
+
+    indicador_id = Column(UUID(as_uuid=True), ForeignKey('indicadores.id'), primary_key=True)
+    dia = Column(Date, primary_key=True, index=True)
+    status_recompensa = Column(Enum(StatusRecompensa), primary_key=True)
+    total_indicacoes = Column(Integer, nullable=False, default=0)
+    total_vendas = Column(Integer, nullable=False, default=0)
+    faturamento_total = Column(Integer, nullable=False, default=0)  # em centavos
+
+    def __repr__(self):
+        return f'<RollupDiario {self.indicador_id} {self.dia} {self.status_recompensa.value}>'
+
+def como_dia(valor):
+    return valor.date() if hasattr(valor, 'date') else valor
+
+def contribuicao(indicador_id, data_indicacao, status_recompensa, gerou_venda, faturamento_gerado):
+    """Chave do rollup e valores somados por uma indicação"""
+    chave = (indicador_id, como_dia(data_indicacao), status_recompensa or StatusRecompensa.NAO)
+    vendeu = bool(gerou_venda)
+    return chave, (1, int(vendeu), (faturamento_gerado or 0) if vendeu else 0)
+
+def acumular(variacoes, chave, valores, sinal=1):
+    atual = variacoes[chave]
+    variacoes[chave] = tuple(a + sinal * v for a, v in zip(atual, valores))
+
+def novas_variacoes():
+    return defaultdict(lambda: (0, 0, 0))
+
+def aplicar_variacoes(connection, variacoes):
+    """Soma as variações nas linhas do rollup (UPDATE, ou INSERT se a linha não existe)"""
+    tabela = RollupDiario.__table__
+    for (indicador_id, dia, status), (indicacoes, vendas, faturamento) in variacoes.items():
+        if not (indicacoes or vendas or faturamento):
+            continue
+        condicao = and_(
+            tabela.c.indicador_id == indicador_id,
+            tabela.c.dia == dia,
+            tabela.c.status_recompensa == status
+        )
+        atualizadas = connection.execute(
+            tabela.update().where(condicao).values(
+                total_indicacoes=tabela.c.total_indicacoes + indicacoes,
+                total_vendas=tabela.c.total_vendas + vendas,
+                faturamento_total=tabela.c.faturamento_total + faturamento
+            )
+        ).rowcount
+        if not atualizadas:
+            connection.execute(tabela.insert().values(
+                indicador_id=indicador_id, dia=dia, status_recompensa=status,
+                total_indicacoes=indicacoes, total_vendas=vendas, faturamento_total=faturamento
+            ))
+        elif indicacoes < 0:
+            # Linhas zeradas saem do rollup, para não contarem como indicador ativo
+            connection.execute(tabela.delete().where(condicao, tabela.c.total_indicacoes <= 0))
+
+def _contribuicao_objeto(indicacao, anterior=False):
+    valores = []
+    for nome in ('indicador_id', 'data_indicacao', 'status_recompensa', 'gerou_venda', 'faturamento_gerado'):
+        if anterior:
+            historico = attributes.get_history(indicacao, nome)
+            if historico.deleted:
+                valores.append(historico.deleted[0])
+                continue
+        valores.append(getattr(indicacao, nome))
+    return contribuicao(*valores)
+
+@event.listens_for(Indicacao, 'after_insert')
+def _rollup_inserir(mapper, connection, target):
+    variacoes = novas_variacoes()
+    acumular(variacoes, *_contribuicao_objeto(target))
+    aplicar_variacoes(connection, variacoes)
+
+@event.listens_for(Indicacao, 'after_update')
+def _rollup_atualizar(mapper, connection, target):
+    variacoes = novas_variacoes()
+    acumular(variacoes, *_contribuicao_objeto(target, anterior=True), sinal=-1)
+    acumular(variacoes, *_contribuicao_objeto(target))
+    aplicar_variacoes(connection, variacoes)
+
+@event.listens_for(Indicacao, 'after_delete')
+def _rollup_excluir(mapper, connection, target):
+    variacoes = novas_variacoes()
+    acumular(variacoes, *_contribuicao_objeto(target), sinal=-1)
+    aplicar_variacoes(connection, variacoes)
@@ -0,0 +1,107 @@
+import re
+from sqlalchemy import Column, String, Index, event, and_
+from sqlalchemy.dialects.postgresql import UUID
+from sqlalchemy.orm import attributes
+from src.models.user import db
+from src.models.indicador import Indicador
+from src.models.indicacao import Indicacao
+
+INDICACAO = 'indicacao'
+INDICADOR = 'indicador'
+CODIGO_PAIS = '55'
+
+class TelefoneBusca(db.Model):
+    """Formas só com dígitos dos telefones de indicações e indicadores
+
+    Cada forma tem um índice próprio, então a busca parcial vira uma faixa
+    (prefixo) no índice: `digitos` para quem digita a partir do DDD, `numero`
+    para quem digita sem DDD e `reverso` para o final do número.
+    """
+    __tablename__ = 'telefones_busca'
+
+    entidade = Column(String(10), primary_key=True)  # 'indicacao' ou 'indicador'
+    registro_id = Column(UUID(as_uuid=True), primary_key=True)
+    digitos = Column(String(20), nullable=False)  # DDD + número
+    numero = Column(String(20), nullable=False)  # número sem DDD
+    reverso = Column(String(20), nullable=False)  # DDD + número invertido
+
+    __table_args__ = (
+        Index('ix_telefones_busca_digitos', 'entidade', 'digitos'),
+        Index('ix_telefones_busca_numero', 'entidade', 'numero'),
+        Index('ix_telefones_busca_reverso', 'entidade', 'reverso'),
+    )
+
+    def __repr__(self):
+        return f'<TelefoneBusca {self.entidade} {self.digitos}>'
+
+def somente_digitos(texto):
+    """Dígitos do telefone (E.164 ou digitado), sem o código do país
+
+    O código do país só é removido de números completos, para "55..." digitado
+    continuar valendo como DDD 55.
+    """
+    digitos = re.sub(r'\D', '', texto or '')
+    if digitos.startswith(CODIGO_PAIS) and (len(digitos) > 11 or (texto or '').lstrip().startswith('+')):
+        return digitos[len(CODIGO_PAIS):]
+    return digitos
+
+def formas_telefone(entidade, registro_id, telefone):
+    digitos = somente_digitos(telefone)
+    return {
+        'entidade': entidade,
+        'registro_id': registro_id,
+        'digitos': digitos,
+        'numero': digitos[2:],
+        'reverso': digitos[::-1]
+    }
+
+def indexar_telefones(connection, entidade, linhas, substituir=False):
+    """Grava as formas dos telefones; linhas: (id, telefone)
+
+    Com `substituir`, as formas anteriores dos mesmos registros são apagadas antes.
+    """
+    tabela = TelefoneBusca.__table__
+    parametros = [formas_telefone(entidade, id_, telefone) for id_, telefone in linhas]
+    if not parametros:
+        return
+    if substituir:
+        connection.execute(tabela.delete().where(and_(
+            tabela.c.entidade == entidade,
+            tabela.c.registro_id.in_([p['registro_id'] for p in parametros])
+        )))
+    connection.execute(tabela.insert(), parametros)
+
+def _remover(connection, entidade, registro_id):
+    tabela = TelefoneBusca.__table__
+    connection.execute(tabela.delete().where(and_(
+        tabela.c.entidade == entidade, tabela.c.registro_id == registro_id
+    )))
+
+def _alterado(objeto, campo):
+    return attributes.get_history(objeto, campo).has_changes()
+
+@event.listens_for(Indicacao, 'after_insert')
+def _telefone_indicacao_inserir(mapper, connection, target):
+    indexar_telefones(connection, INDICACAO, [(target.id, target.telefone_indicado)])
+
+@event.listens_for(Indicacao, 'after_update')
+def _telefone_indicacao_atualizar(mapper, connection, target):
+    if _alterado(target, 'telefone_indicado'):
+        indexar_telefones(connection, INDICACAO, [(target.id, target.telefone_indicado)], substituir=True)
+
+@event.listens_for(Indicacao, 'after_delete')
+def _telefone_indicacao_excluir(mapper, connection, target):
+    _remover(connection, INDICACAO, target.id)
+
+@event.listens_for(Indicador, 'after_insert')
+def _telefone_indicador_inserir(mapper, connection, target):
+    indexar_telefones(connection, INDICADOR, [(target.id, target.telefone)])
+
+@event.listens_for(Indicador, 'after_update')
+def _telefone_indicador_atualizar(mapper, connection, target):
+    if _alterado(target, 'telefone'):
+        indexar_telefones(connection, INDICADOR, [(target.id, target.telefone)], substituir=True)
+
+@event.listens_for(Indicador, 'after_delete')
+def _telefone_indicador_excluir(mapper, connection, target):
+    _remover(connection, INDICADOR, target.id)
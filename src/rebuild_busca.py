@@ -0,0 +1,27 @@
+#!/usr/bin/env python3
+"""
+Script para reconstruir do zero os índices de busca (texto e telefones)
+"""
+import sys
+import os
+
+# Adiciona o diretório raiz do projeto ao PATH
+sys.path.insert(0, os.path.dirname(os.path.dirname(__file__)))
+
+from src.main import app, inicializar
+from src.services.busca import reconstruir_indice_busca
+from src.services.busca_telefone import reconstruir_telefones
+
+def main():
+    """Recria os índices de busca a partir de indicações e indicadores"""
+    inicializar(app, retomar_jobs=False)
+    with app.app_context():
+        print("🔄 Reconstruindo o índice de busca textual...")
+        linhas = reconstruir_indice_busca()
+        print(f"✅ Índice reconstruído: {linhas} indicações indexadas")
+        print("🔄 Reconstruindo as formas dos telefones...")
+        telefones = reconstruir_telefones()
+        print(f"✅ Telefones reconstruídos: {telefones} linhas")
+
+if __name__ == "__main__":
+    main()
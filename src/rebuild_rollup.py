@@ -0,0 +1,23 @@
+#!/usr/bin/env python3
+"""
+Script para reconstruir do zero o rollup diário de indicações
+"""
+import sys
+import os
+
+# Adiciona o diretório raiz do projeto ao PATH
+sys.path.insert(0, os.path.dirname(os.path.dirname(__file__)))
+
+from src.main import app, inicializar
+from src.services.rollup import reconstruir_rollup
+
+def main():
+    """Recalcula o rollup a partir da tabela de indicações"""
+    inicializar(app, retomar_jobs=False)
+    with app.app_context():
+        print("🔄 Reconstruindo rollup diário de indicações...")
+        linhas = reconstruir_rollup()
+        print(f"✅ Rollup reconstruído: {linhas} linhas (indicador, dia, status)")
+
+if __name__ == "__main__":
+    main()
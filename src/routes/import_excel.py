@@ -1,16 +1,20 @@
-from flask import Blueprint, request, jsonify
+from flask import Blueprint, request, jsonify, current_app
+import io
 import pandas as pd
-import openpyxl
 from src.models.user import db
-from src.models.indicador import Indicador
-from src.models.indicacao import Indicacao, StatusRecompensa
-from datetime import datetime
-import phonenumbers
-import uuid
-import re
+from src.services.import_readers import lotes_excel, lotes_csv, lotes_ndjson, tamanho_lote_configurado
+from src.services.import_runner import importar_lotes, validar_lotes
+from src.services.bulk_writer import tamanho_chunk_configurado
+from src.services.import_dedup import hash_arquivo, StreamComHash
+from src.services.import_jobs import criar_job, encerrar_jobs_abandonados
+from src.models.import_job import ImportJob, StatusJob
 
 import_bp = Blueprint('import', __name__)
 
+def _dry_run():
+    """Simulação pedida com ?dry_run=1: valida tudo sem gravar nem consultar o banco"""
+    return request.args.get('dry_run') in ('1', 'true')
+
 @import_bp.route('/import/excel', methods=['POST'])
 def import_excel():
     try:
@@ -24,117 +28,37 @@ def import_excel():
         if not file.filename.endswith(('.xlsx', '.xls')):
             return jsonify({'error': 'Arquivo deve ser Excel (.xlsx ou .xls)'}), 400
         
-        # Ler o arquivo Excel
-        df = pd.read_excel(file)
-        
-        # Relatório de importação
-        relatorio = {
-            'total_linhas': len(df),
-            'linhas_processadas': 0,
-            'linhas_criadas': 0,
-            'linhas_com_erro': 0,
-            'erros': []
-        }
-        
-        for index, row in df.iterrows():
-            try:
-                # Pular linhas vazias
-                if pd.isna(row).all():
-                    continue
-                
-                relatorio['linhas_processadas'] += 1
-                
-                # Mapear colunas (ajustar conforme estrutura real da planilha)
-                data_indicacao = row.get('Data da Indicação') or row.get('Data')
-                nome_indicador = row.get('Nome do Cliente Indicador') or row.get('Indicador')
-                telefone_indicador = row.get('Telefone do Cliente Indicador') or row.get('Telefone Indicador')
-                nome_indicado = row.get('Nome da Indicação') or row.get('Indicado')
-                telefone_indicado = row.get('Telefone da Indicação') or row.get('Telefone Indicado')
-                gerou_venda = row.get('Gerou Venda?') or row.get('Venda')
-                faturamento = row.get('Faturamento Gerado') or row.get('Faturamento')
-                
-                # Validar dados obrigatórios
-                if pd.isna(data_indicacao) or pd.isna(nome_indicador) or pd.isna(nome_indicado):
-                    relatorio['erros'].append(f'Linha {index + 1}: Dados obrigatórios faltando')
-                    relatorio['linhas_com_erro'] += 1
-                    continue
-                
-                # Processar data
-                if isinstance(data_indicacao, str):
-                    try:
-                        data_indicacao = datetime.strptime(data_indicacao, '%d/%m/%Y')
-                    except:
-                        try:
-                            data_indicacao = datetime.strptime(data_indicacao, '%Y-%m-%d')
-                        except:
-                            relatorio['erros'].append(f'Linha {index + 1}: Formato de data inválido')
-                            relatorio['linhas_com_erro'] += 1
-                            continue
-                
-                # Processar telefones
-                try:
-                    telefone_indicador_norm = normalizar_telefone(telefone_indicador)
-                    telefone_indicado_norm = normalizar_telefone(telefone_indicado)
-                except:
-                    relatorio['erros'].append(f'Linha {index + 1}: Telefone inválido')
-                    relatorio['linhas_com_erro'] += 1
-                    continue
-                
-                # Processar venda e faturamento
-                gerou_venda_bool = False
-                faturamento_centavos = 0
-                
-                if not pd.isna(gerou_venda):
-                    gerou_venda_str = str(gerou_venda).lower()
-                    gerou_venda_bool = gerou_venda_str in ['sim', 'yes', 'true', '1']
-                
-                if gerou_venda_bool and not pd.isna(faturamento):
-                    try:
-                        # Limpar formatação de moeda
-                        faturamento_str = str(faturamento).replace('R$', '').replace('.', '').replace(',', '.')
-                        faturamento_float = float(re.sub(r'[^\d,.]', '', faturamento_str))
-                        faturamento_centavos = int(faturamento_float * 100)
-                    except:
-                        faturamento_centavos = 0
-                
-                # Encontrar ou criar indicador
-                indicador = Indicador.query.filter_by(
-                    nome=nome_indicador,
-                    telefone=telefone_indicador_norm
-                ).first()
-                
-                if not indicador:
-                    indicador = Indicador(
-                        id=uuid.uuid4(),
-                        nome=nome_indicador,
-                        telefone=telefone_indicador_norm
-                    )
-                    db.session.add(indicador)
-                    db.session.flush()
-                
-                # Criar indicação
-                status_recompensa = StatusRecompensa.EM_PROCESSAMENTO if gerou_venda_bool else StatusRecompensa.NAO
-                
-                indicacao = Indicacao(
-                    id=uuid.uuid4(),
-                    data_indicacao=data_indicacao,
-                    nome_indicado=nome_indicado,
-                    telefone_indicado=telefone_indicado_norm,
-                    gerou_venda=gerou_venda_bool,
-                    faturamento_gerado=faturamento_centavos,
-                    status_recompensa=status_recompensa,
-                    indicador_id=indicador.id
-                )
-                
-                db.session.add(indicacao)
-                relatorio['linhas_criadas'] += 1
-                
-            except Exception as e:
-                relatorio['erros'].append(f'Linha {index + 1}: {str(e)}')
-                relatorio['linhas_com_erro'] += 1
-                continue
-        
-        db.session.commit()
+        tamanho_chunk = tamanho_chunk_configurado(request.args.get('chunk_size'))
+        
+        # Modo assíncrono: devolve o id do job e importa em segundo plano
+        if request.args.get('async') in ('1', 'true') and not _dry_run():
+            job = criar_job(current_app._get_current_object(), file, tamanho_chunk)
+            return jsonify({
+                'message': 'Importação agendada',
+                'job_id': str(job.id),
+                'status': job.status.value
+            }), 202
+        
+        # Arquivos grandes são lidos em streaming (openpyxl read_only), em lotes
+        streaming = request.args.get('modo') == 'streaming' or \
+            (request.content_length or 0) > current_app.config['IMPORT_MAX_IN_MEMORY_SIZE']
+        
+        if streaming and not file.filename.endswith('.xlsx'):
+            return jsonify({'error': 'Importação em streaming requer arquivo .xlsx'}), 400
+        
+        hash_conteudo = hash_arquivo(file.stream)
+        if streaming:
+            lotes = lotes_excel(file.stream, tamanho_lote_configurado(tamanho_chunk))
+        else:
+            lotes = [pd.read_excel(file)]
+        
+        if _dry_run():
+            return jsonify({
+                'message': 'Simulação concluída',
+                'relatorio': validar_lotes(lotes)
+            }), 200
+        
+        relatorio = importar_lotes(lotes, tamanho_chunk, nome_arquivo=file.filename, hash_arquivo=hash_conteudo)
         
         return jsonify({
             'message': 'Importação concluída',
@@ -145,21 +69,83 @@ def import_excel():
         db.session.rollback()
         return jsonify({'error': f'Erro na importação: {str(e)}'}), 500
 
-def normalizar_telefone(telefone):
-    """Normaliza telefone para formato E.164 brasileiro"""
-    if pd.isna(telefone):
-        raise ValueError("Telefone vazio")
-    
-    telefone_str = str(telefone).strip()
-    if not telefone_str:
-        raise ValueError("Telefone vazio")
-    
+def _stream_enviado():
+    """Arquivo enviado como multipart (`file`) ou o próprio corpo da requisição
+
+    O corpo bruto é lido direto do socket; o multipart é mantido pelo Werkzeug
+    em arquivo temporário, nunca inteiro em memória. Retorna (nome, stream),
+    com o stream calculando o hash do conteúdo conforme é lido.
+    """
+    if 'file' in request.files:
+        file = request.files['file']
+        return file.filename, StreamComHash(file.stream)
+    return None, StreamComHash(request.stream)
+
+@import_bp.route('/import/csv', methods=['POST'])
+def import_csv():
     try:
-        parsed = phonenumbers.parse(telefone_str, 'BR')
-        if phonenumbers.is_valid_number(parsed):
-            return phonenumbers.format_number(parsed, phonenumbers.PhoneNumberFormat.E164)
-        else:
-            raise ValueError("Telefone inválido")
-    except:
-        raise ValueError("Não foi possível normalizar o telefone")
+        tamanho_chunk = tamanho_chunk_configurado(request.args.get('chunk_size'))
+        nome_arquivo, stream = _stream_enviado()
+        lotes = lotes_csv(
+            io.BufferedReader(stream),
+            tamanho_lote_configurado(tamanho_chunk),
+            sep=request.args.get('sep', ','),
+            encoding=request.args.get('encoding', 'utf-8')
+        )
+        if _dry_run():
+            return jsonify({
+                'message': 'Simulação concluída',
+                'relatorio': validar_lotes(lotes)
+            }), 200
+        
+        relatorio = importar_lotes(lotes, tamanho_chunk, nome_arquivo=nome_arquivo, hash_arquivo=stream.hexdigest)
+        
+        return jsonify({
+            'message': 'Importação concluída',
+            'relatorio': relatorio
+        }), 200
+        
+    except Exception as e:
+        db.session.rollback()
+        return jsonify({'error': f'Erro na importação: {str(e)}'}), 500
+
+@import_bp.route('/import/ndjson', methods=['POST'])
+def import_ndjson():
+    try:
+        tamanho_chunk = tamanho_chunk_configurado(request.args.get('chunk_size'))
+        nome_arquivo, stream = _stream_enviado()
+        lotes = lotes_ndjson(
+            io.BufferedReader(stream),
+            tamanho_lote_configurado(tamanho_chunk),
+            encoding=request.args.get('encoding', 'utf-8')
+        )
+        if _dry_run():
+            return jsonify({
+                'message': 'Simulação concluída',
+                'relatorio': validar_lotes(lotes)
+            }), 200
+        
+        relatorio = importar_lotes(lotes, tamanho_chunk, nome_arquivo=nome_arquivo, hash_arquivo=stream.hexdigest)
+        
+        return jsonify({
+            'message': 'Importação concluída',
+            'relatorio': relatorio
+        }), 200
+        
+    except Exception as e:
+        db.session.rollback()
+        return jsonify({'error': f'Erro na importação: {str(e)}'}), 500
 
+@import_bp.route('/import/jobs/<uuid:job_id>', methods=['GET'])
+def get_import_job(job_id):
+    try:
+        job = db.session.get(ImportJob, job_id)
+        if job is None:
+            return jsonify({'error': 'Job de importação não encontrado'}), 404
+        # Worker morto: o job é encerrado em vez de ficar "processando" para sempre
+        if job.status == StatusJob.PROCESSANDO:
+            if encerrar_jobs_abandonados(current_app._get_current_object()):
+                db.session.refresh(job)
+        return jsonify(job.to_dict())
+    except Exception as e:
+        return jsonify({'error': str(e)}), 500
@@ -1,11 +1,18 @@
 from flask import Blueprint, request, jsonify
+import uuid
 from src.models.user import db
 from src.models.indicacao import Indicacao, StatusRecompensa
 from src.models.indicador import Indicador
 from src.schemas.indicacao_schema import indicacao_schema, indicacoes_schema
+from src.services.indicador_resolver import IndicadorResolver, chave_indicador
+from src.services.kpis import calcular_kpis
+from src.services.response_cache import resposta_em_cache
+from src.services.timeseries import serie_kpis, GRANULARIDADES
+from src.services.paginacao import pagina_por_cursor, total_solicitado, CursorInvalido
+from src.services.relatorio_queries import parse_uuid
+from src.services.busca import buscar_indicacoes
 from marshmallow import ValidationError
 from datetime import datetime
-from sqlalchemy import func
 
 indicacoes_bp = Blueprint('indicacoes', __name__)
 
@@ -26,11 +33,7 @@ def get_indicacoes():
         
         # Filtros
         if search:
-            query = query.filter(
-                (Indicacao.nome_indicado.ilike(f'%{search}%')) |
-                (Indicacao.telefone_indicado.ilike(f'%{search}%')) |
-                (Indicador.nome.ilike(f'%{search}%'))
-            )
+            query = buscar_indicacoes(query, search)
         
         if data_inicio:
             query = query.filter(Indicacao.data_indicacao >= datetime.fromisoformat(data_inicio))
@@ -39,7 +42,7 @@ def get_indicacoes():
             query = query.filter(Indicacao.data_indicacao <= datetime.fromisoformat(data_fim))
         
         if indicador_id:
-            query = query.filter(Indicacao.indicador_id == indicador_id)
+            query = query.filter(Indicacao.indicador_id == parse_uuid(indicador_id))
         
         if gerou_venda is not None:
             query = query.filter(Indicacao.gerou_venda == (gerou_venda.lower() == 'true'))
@@ -47,6 +50,20 @@ def get_indicacoes():
         if status_recompensa:
             query = query.filter(Indicacao.status_recompensa == StatusRecompensa(status_recompensa))
         
+        # Modo cursor (keyset): mais recentes primeiro, custo constante por página
+        if 'cursor' in request.args:
+            total = query.order_by(None).count() if total_solicitado(request.args) else None
+            itens, proximo, per_page = pagina_por_cursor(
+                query, [Indicacao.data_indicacao, Indicacao.id], [datetime.fromisoformat, uuid.UUID],
+                request.args.get('cursor'), per_page, decrescente=True
+            )
+            return jsonify({
+                'indicacoes': indicacoes_schema.dump(itens),
+                'next_cursor': proximo,
+                'per_page': per_page,
+                'total': total
+            })
+        
         indicacoes = query.paginate(
             page=page, 
             per_page=per_page, 
@@ -59,6 +76,8 @@ def get_indicacoes():
             'pages': indicacoes.pages,
             'current_page': page
         })
+    except CursorInvalido as e:
+        return jsonify({'error': str(e)}), 400
     except Exception as e:
         return jsonify({'error': str(e)}), 500
 
@@ -69,20 +88,16 @@ def create_indicacao():
         
         # Se indicador_id não foi fornecido, tentar encontrar ou criar indicador
         if 'indicador_id' not in data and 'indicador' in data:
-            indicador_data = data['indicador']
-            indicador = Indicador.query.filter_by(
-                nome=indicador_data['nome'],
-                telefone=indicador_data['telefone']
-            ).first()
+            from src.schemas.indicador_schema import indicador_schema
+            indicador = indicador_schema.load(data.pop('indicador'))
+            chave = chave_indicador(indicador.nome, indicador.telefone)
             
-            if not indicador:
-                # Criar novo indicador
-                from src.schemas.indicador_schema import indicador_schema
-                indicador = indicador_schema.load(indicador_data)
-                db.session.add(indicador)
-                db.session.flush()  # Para obter o ID
+            resolver = IndicadorResolver()
+            resolver.resolver([chave], detalhes={
+                chave: {'email': indicador.email, 'empresa': indicador.empresa}
+            })
             
-            data['indicador_id'] = str(indicador.id)
+            data['indicador_id'] = str(resolver.ids[chave])
         
         indicacao = indicacao_schema.load(data)
         
@@ -124,6 +139,14 @@ def update_indicacao(indicacao_id):
             if hasattr(indicacao, key) and key not in ['id', 'created_at', 'updated_at']:
                 if key == 'status_recompensa':
                     setattr(indicacao, key, StatusRecompensa(value))
+                elif key == 'data_indicacao':
+                    # Texto ISO, como na criação: o rollup agrupa pelo dia da data convertida
+                    try:
+                        setattr(indicacao, key, datetime.fromisoformat(value))
+                    except (TypeError, ValueError):
+                        raise ValidationError('Formato de data inválido')
+                elif key == 'indicador_id':
+                    setattr(indicacao, key, parse_uuid(value))
                 else:
                     setattr(indicacao, key, value)
         
@@ -159,6 +182,7 @@ def delete_indicacao(indicacao_id):
         return jsonify({'error': str(e)}), 500
 
 @indicacoes_bp.route('/dashboard', methods=['GET'])
+@resposta_em_cache
 def get_dashboard():
     try:
         # Filtros opcionais
@@ -167,37 +191,42 @@ def get_dashboard():
         indicador_id = request.args.get('indicador_id')
         status_recompensa = request.args.get('status_recompensa')
         
-        query = Indicacao.query
-        
-        # Aplicar filtros
-        if data_inicio:
-            query = query.filter(Indicacao.data_indicacao >= datetime.fromisoformat(data_inicio))
-        
-        if data_fim:
-            query = query.filter(Indicacao.data_indicacao <= datetime.fromisoformat(data_fim))
-        
-        if indicador_id:
-            query = query.filter(Indicacao.indicador_id == indicador_id)
-        
-        if status_recompensa:
-            query = query.filter(Indicacao.status_recompensa == StatusRecompensa(status_recompensa))
-        
-        # Calcular KPIs
-        total_indicados = query.count()
-        total_indicadores = query.join(Indicador).with_entities(Indicacao.indicador_id).distinct().count()
-        total_vendas = query.filter(Indicacao.gerou_venda == True).count()
-        taxa_conversao = (total_vendas / total_indicados * 100) if total_indicados > 0 else 0
-        faturamento_total = query.filter(Indicacao.gerou_venda == True).with_entities(
-            func.sum(Indicacao.faturamento_gerado)
-        ).scalar() or 0
+        # Todos os KPIs em uma única consulta
+        kpis = calcular_kpis(
+            inicio=datetime.fromisoformat(data_inicio) if data_inicio else None,
+            fim=datetime.fromisoformat(data_fim) if data_fim else None,
+            indicador_id=indicador_id,
+            status_recompensa=status_recompensa
+        )
         
         return jsonify({
-            'total_indicados': total_indicados,
-            'total_indicadores': total_indicadores,
-            'total_vendas': total_vendas,
-            'taxa_conversao': round(taxa_conversao, 2),
-            'faturamento_total': faturamento_total
+            'total_indicados': kpis['total_indicacoes'],
+            'total_indicadores': kpis['total_indicadores'],
+            'total_vendas': kpis['total_vendas'],
+            'taxa_conversao': round(kpis['taxa_conversao'], 2),
+            'faturamento_total': kpis['faturamento_total']
         })
     except Exception as e:
         return jsonify({'error': str(e)}), 500
 
+@indicacoes_bp.route('/kpis/timeseries', methods=['GET'])
+@resposta_em_cache
+def get_kpis_timeseries():
+    """KPIs agrupados por dia, semana ou mês, com os mesmos filtros do dashboard"""
+    try:
+        granularidade = request.args.get('granularity', 'day')
+        data_inicio = request.args.get('from')
+        data_fim = request.args.get('to')
+        
+        if granularidade not in GRANULARIDADES:
+            return jsonify({'error': f"granularity deve ser um de: {', '.join(GRANULARIDADES)}"}), 400
+        
+        return jsonify(serie_kpis(
+            granularidade,
+            inicio=datetime.fromisoformat(data_inicio) if data_inicio else None,
+            fim=datetime.fromisoformat(data_fim) if data_fim else None,
+            indicador_id=request.args.get('indicador_id'),
+            status_recompensa=request.args.get('status_recompensa')
+        ))
+    except Exception as e:
+        return jsonify({'error': str(e)}), 500
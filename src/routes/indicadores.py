@@ -1,9 +1,12 @@
 from flask import Blueprint, request, jsonify
+import uuid
 from src.models.user import db
 from src.models.indicador import Indicador
 from src.schemas.indicador_schema import indicador_schema, indicadores_schema
 from marshmallow import ValidationError
 from sqlalchemy.exc import IntegrityError
+from src.services.paginacao import pagina_por_cursor, total_solicitado, CursorInvalido
+from src.services.busca import buscar_indicadores
 
 indicadores_bp = Blueprint('indicadores', __name__)
 
@@ -17,10 +20,21 @@ def get_indicadores():
         query = Indicador.query
         
         if search:
-            query = query.filter(
-                (Indicador.nome.ilike(f'%{search}%')) |
-                (Indicador.telefone.ilike(f'%{search}%'))
+            query = buscar_indicadores(query, search)
+        
+        # Modo cursor (keyset) por nome, custo constante por página
+        if 'cursor' in request.args:
+            total = query.order_by(None).count() if total_solicitado(request.args) else None
+            itens, proximo, per_page = pagina_por_cursor(
+                query, [Indicador.nome, Indicador.id], [str, uuid.UUID],
+                request.args.get('cursor'), per_page
             )
+            return jsonify({
+                'indicadores': indicadores_schema.dump(itens),
+                'next_cursor': proximo,
+                'per_page': per_page,
+                'total': total
+            })
         
         indicadores = query.paginate(
             page=page, 
@@ -34,6 +48,8 @@ def get_indicadores():
             'pages': indicadores.pages,
             'current_page': page
         })
+    except CursorInvalido as e:
+        return jsonify({'error': str(e)}), 400
     except Exception as e:
         return jsonify({'error': str(e)}), 500
 
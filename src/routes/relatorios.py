@@ -1,36 +1,56 @@
-from flask import Blueprint, request, jsonify, send_file
-from datetime import datetime, timedelta
-from sqlalchemy import func, and_, or_
-from openpyxl import Workbook
-from openpyxl.styles import Font, PatternFill, Alignment, Border, Side
-from openpyxl.utils import get_column_letter
+from flask import Blueprint, request, jsonify, send_file, Response, stream_with_context, current_app
 import io
-import tempfile
-import os
 
 from src.models.user import db
-from src.models.indicador import Indicador
-from src.models.indicacao import Indicacao, StatusRecompensa
+from src.services.formatacao import format_phone, nome_arquivo_relatorio
+from src.services.excel_export import escrever_relatorio_excel
+from src.services.relatorio_queries import (
+    parse_data, query_indicacoes_completas, query_performance, ORDENACOES_PERFORMANCE
+)
+from src.services.kpis import calcular_kpis
+from src.services.stream_export import gerar_csv, gerar_ndjson
+from src.services.parquet_export import escrever_relatorio_parquet
+from src.services.export_cache import Artefato, exportacao_em_cache, cache_exportacoes
+from src.services.response_cache import resposta_em_cache, cache_respostas
+from src.services.versao_dados import versao_atual
+from src.services.export_jobs import criar_job_exportacao, fila_cheia, reenfileirar_exportacoes_abandonadas
+from src.models.export_job import ExportJob
+from src.models.import_job import StatusJob
 
 relatorios_bp = Blueprint('relatorios', __name__)
 
-def format_currency(value_in_cents):
-    """Converte centavos para formato de moeda brasileira"""
-    if value_in_cents is None:
-        return "R$ 0,00"
-    return f"R$ {value_in_cents / 100:,.2f}".replace(',', 'X').replace('.', ',').replace('X', '.')
+def _enviar_exportacao(chave, gerar, tipo_relatorio, data_inicio, data_fim):
+    """Envia o arquivo do cache de exportações, gerando-o apenas quando necessário"""
+    artefato, acerto = exportacao_em_cache(chave, gerar)
+    resposta = send_file(
+        io.BytesIO(artefato.conteudo),
+        as_attachment=True,
+        download_name=nome_arquivo_relatorio(tipo_relatorio, data_inicio, data_fim, artefato.extensao),
+        mimetype=artefato.mimetype
+    )
+    resposta.headers['X-Cache'] = 'HIT' if acerto else 'MISS'
+    return resposta
 
-def format_phone(phone):
-    """Formata telefone para exibição"""
-    if not phone:
-        return ""
-    # Remove +55 e formata como (XX) XXXXX-XXXX
-    clean_phone = phone.replace('+55', '')
-    if len(clean_phone) == 11:
-        return f"({clean_phone[:2]}) {clean_phone[2:7]}-{clean_phone[7:]}"
-    return phone
+def _exportacao_assincrona():
+    """Exportação em segundo plano pedida com ?async=1"""
+    return request.args.get('async') in ('1', 'true')
+
+def _agendar_exportacao(formato, tipo_relatorio, data_inicio, data_fim, indicador_id):
+    app = current_app._get_current_object()
+    reenfileirar_exportacoes_abandonadas(app)
+    if fila_cheia(app):
+        return jsonify({'error': 'Muitas exportações em andamento, tente novamente em instantes'}), 429
+    
+    job = criar_job_exportacao(app, formato, tipo_relatorio, data_inicio, data_fim, indicador_id)
+    return jsonify({
+        'message': 'Exportação agendada',
+        'job_id': str(job.id),
+        'status': job.status.value,
+        'status_url': f'/api/export/jobs/{job.id}'
+    }), 202
 
 @relatorios_bp.route('/dashboard-stats', methods=['GET'])
+@resposta_em_cache
 def get_dashboard_stats():
     """Retorna estatísticas para o dashboard com filtros opcionais"""
     try:
@@ -39,44 +59,45 @@ def get_dashboard_stats():
         data_fim = request.args.get('data_fim')
         indicador_id = request.args.get('indicador_id')
         
-        # Query base
-        query = db.session.query(Indicacao)
-        
-        # Aplicar filtros
-        if data_inicio:
-            query = query.filter(Indicacao.data_indicacao >= datetime.strptime(data_inicio, '%Y-%m-%d').date())
-        if data_fim:
-            query = query.filter(Indicacao.data_indicacao <= datetime.strptime(data_fim, '%Y-%m-%d').date())
-        if indicador_id:
-            query = query.filter(Indicacao.indicador_id == indicador_id)
-        
-        # Calcular estatísticas
-        total_indicacoes = query.count()
-        total_vendas = query.filter(Indicacao.gerou_venda == True).count()
-        faturamento_total = query.filter(Indicacao.gerou_venda == True).with_entities(
-            func.sum(Indicacao.faturamento_gerado)
-        ).scalar() or 0
-        
-        # Total de indicadores únicos
-        total_indicadores = db.session.query(Indicador).count()
-        if indicador_id:
-            total_indicadores = 1
-        
-        # Taxa de conversão
-        taxa_conversao = (total_vendas / total_indicacoes * 100) if total_indicacoes > 0 else 0
+        # Todos os KPIs em uma única consulta; total_indicadores aqui é o
+        # total cadastrado (ou 1 quando filtrado por indicador)
+        kpis = calcular_kpis(
+            inicio=parse_data(data_inicio) if data_inicio else None,
+            fim=parse_data(data_fim) if data_fim else None,
+            indicador_id=indicador_id,
+            incluir_indicadores_cadastrados=not indicador_id
+        )
+        total_indicadores = 1 if indicador_id else kpis['total_indicadores_cadastrados']
         
         return jsonify({
-            'total_indicacoes': total_indicacoes,
+            'total_indicacoes': kpis['total_indicacoes'],
             'total_indicadores': total_indicadores,
-            'total_vendas': total_vendas,
-            'taxa_conversao': round(taxa_conversao, 1),
-            'faturamento_total': faturamento_total
+            'total_vendas': kpis['total_vendas'],
+            'taxa_conversao': round(kpis['taxa_conversao'], 1),
+            'faturamento_total': kpis['faturamento_total']
         })
         
     except Exception as e:
         return jsonify({'error': str(e)}), 500
 
+LIMITE_PAGINA_PERFORMANCE = 50
+LIMITE_MAXIMO_PERFORMANCE = 500
+
+def _performance_dict(resultado):
+    return {
+        'id': str(resultado.id),
+        'nome': resultado.nome,
+        'empresa': resultado.empresa,
+        'telefone': format_phone(resultado.telefone),
+        'email': resultado.email,
+        'total_indicacoes': resultado.total_indicacoes,
+        'total_vendas': resultado.total_vendas,
+        'taxa_conversao': round(resultado.taxa_conversao, 1),
+        'faturamento_total': resultado.faturamento_total
+    }
+
 @relatorios_bp.route('/performance-indicadores', methods=['GET'])
+@resposta_em_cache
 def get_performance_indicadores():
     """Retorna performance detalhada por indicador"""
     try:
@@ -84,60 +105,52 @@ def get_performance_indicadores():
         data_inicio = request.args.get('data_inicio')
         data_fim = request.args.get('data_fim')
         
-        # Query com join para pegar dados do indicador e suas indicações
-        query = db.session.query(
-            Indicador.id,
-            Indicador.nome,
-            Indicador.empresa,
-            Indicador.telefone,
-            Indicador.email,
-            func.count(Indicacao.id).label('total_indicacoes'),
-            func.sum(func.case((Indicacao.gerou_venda == True, 1), else_=0)).label('total_vendas'),
-            func.sum(func.case((Indicacao.gerou_venda == True, Indicacao.faturamento_gerado), else_=0)).label('faturamento_total')
-        ).outerjoin(Indicacao).group_by(Indicador.id)
+        # Ordenação e paginação feitas no banco
+        ordenar_por = request.args.get('sort', 'faturamento')  # faturamento, conversao, vendas, indicacoes, nome
+        decrescente = request.args.get('order', 'asc' if ordenar_por == 'nome' else 'desc') != 'asc'
+        top = request.args.get('top', type=int)
+        limit = request.args.get('limit', type=int)
+        offset = request.args.get('offset', 0, type=int)
         
-        # Aplicar filtros de data nas indicações
-        if data_inicio or data_fim:
-            if data_inicio:
-                query = query.filter(or_(
-                    Indicacao.data_indicacao >= datetime.strptime(data_inicio, '%Y-%m-%d').date(),
-                    Indicacao.id.is_(None)
-                ))
-            if data_fim:
-                query = query.filter(or_(
-                    Indicacao.data_indicacao <= datetime.strptime(data_fim, '%Y-%m-%d').date(),
-                    Indicacao.id.is_(None)
-                ))
+        if ordenar_por not in ORDENACOES_PERFORMANCE:
+            return jsonify({'error': f"sort deve ser um de: {', '.join(ORDENACOES_PERFORMANCE)}"}), 400
         
-        resultados = query.all()
+        query = query_performance(data_inicio, data_fim, ordenar_por, decrescente)
         
-        performance = []
-        for resultado in resultados:
-            total_indicacoes = resultado.total_indicacoes or 0
-            total_vendas = resultado.total_vendas or 0
-            faturamento_total = resultado.faturamento_total or 0
-            taxa_conversao = (total_vendas / total_indicacoes * 100) if total_indicacoes > 0 else 0
-            
-            performance.append({
-                'id': str(resultado.id),
-                'nome': resultado.nome,
-                'empresa': resultado.empresa,
-                'telefone': format_phone(resultado.telefone),
-                'email': resultado.email,
-                'total_indicacoes': total_indicacoes,
-                'total_vendas': total_vendas,
-                'taxa_conversao': round(taxa_conversao, 1),
-                'faturamento_total': faturamento_total
-            })
+        if limit is None and 'offset' not in request.args:
+            # Formato de lista (usado pela interface): apenas os N primeiros, nunca a tabela inteira
+            top = LIMITE_PAGINA_PERFORMANCE if top is None else top
+            top = min(max(top, 0), LIMITE_MAXIMO_PERFORMANCE)
+            return jsonify([_performance_dict(r) for r in query.limit(top).all()])
         
-        # Ordenar por faturamento total (decrescente)
-        performance.sort(key=lambda x: x['faturamento_total'], reverse=True)
+        # Página: busca uma linha a mais para saber se há próxima página
+        limit = min(max(limit or LIMITE_PAGINA_PERFORMANCE, 1), LIMITE_MAXIMO_PERFORMANCE)
+        offset = max(offset, 0)
+        resultados = query.offset(offset).limit(limit + 1).all()
+        tem_mais = len(resultados) > limit
         
-        return jsonify(performance)
+        return jsonify({
+            'items': [_performance_dict(r) for r in resultados[:limit]],
+            'limit': limit,
+            'offset': offset,
+            'next_offset': offset + limit if tem_mais else None
+        })
         
     except Exception as e:
         return jsonify({'error': str(e)}), 500
 
+@relatorios_bp.route('/cache/stats', methods=['GET'])
+def get_cache_stats():
+    """Acertos, falhas e ocupação dos caches de respostas e de exportações"""
+    try:
+        return jsonify({
+            'versao_dados': versao_atual(),
+            'respostas': cache_respostas().estatisticas(),
+            'exportacoes': cache_exportacoes().estatisticas()
+        })
+    except Exception as e:
+        return jsonify({'error': str(e)}), 500
+
 @relatorios_bp.route('/export/excel', methods=['GET'])
 def export_excel():
     """Exporta dados para Excel com múltiplas abas"""
@@ -148,184 +161,115 @@ def export_excel():
         indicador_id = request.args.get('indicador_id')
         tipo_relatorio = request.args.get('tipo', 'completo')  # completo, indicacoes, indicadores
         
-        # Criar workbook
-        wb = Workbook()
+        if _exportacao_assincrona():
+            return _agendar_exportacao('xlsx', tipo_relatorio, data_inicio, data_fim, indicador_id)
         
-        # Estilos
-        header_font = Font(bold=True, color="FFFFFF")
-        header_fill = PatternFill(start_color="7C3AED", end_color="7C3AED", fill_type="solid")
-        border = Border(
-            left=Side(style='thin'),
-            right=Side(style='thin'),
-            top=Side(style='thin'),
-            bottom=Side(style='thin')
-        )
+        def gerar():
+            # Gerar relatório em memória (write_only, linhas em lotes do banco)
+            buffer = io.BytesIO()
+            escrever_relatorio_excel(buffer, tipo_relatorio, data_inicio, data_fim, indicador_id)
+            return Artefato(
+                buffer.getvalue(),
+                'xlsx',
+                'application/vnd.openxmlformats-officedocument.spreadsheetml.sheet'
+            )
+        
+        return _enviar_exportacao(('xlsx', tipo_relatorio, data_inicio, data_fim, indicador_id),
+                                  gerar, tipo_relatorio, data_inicio, data_fim)
+        
+    except Exception as e:
+        return jsonify({'error': str(e)}), 500
+
+@relatorios_bp.route('/export/parquet', methods=['GET'])
+def export_parquet():
+    """Exporta dados tipados em Parquet (um zip com os dois arquivos no modo completo)"""
+    try:
+        data_inicio = request.args.get('data_inicio')
+        data_fim = request.args.get('data_fim')
+        indicador_id = request.args.get('indicador_id')
+        tipo_relatorio = request.args.get('tipo', 'completo')  # completo, indicacoes, indicadores
         
-        if tipo_relatorio in ['completo', 'indicacoes']:
-            # Aba 1: Indicações
-            ws_indicacoes = wb.active
-            ws_indicacoes.title = "Indicações"
-            
-            # Query das indicações
-            query = db.session.query(
-                Indicacao.data_indicacao,
-                Indicador.nome.label('indicador_nome'),
-                Indicador.empresa.label('indicador_empresa'),
-                Indicador.telefone.label('indicador_telefone'),
-                Indicacao.nome_indicado,
-                Indicacao.telefone_indicado,
-                Indicacao.gerou_venda,
-                Indicacao.faturamento_gerado,
-                Indicacao.status_recompensa,
-                Indicacao.observacoes
-            ).join(Indicador)
-            
-            # Aplicar filtros
-            if data_inicio:
-                query = query.filter(Indicacao.data_indicacao >= datetime.strptime(data_inicio, '%Y-%m-%d').date())
-            if data_fim:
-                query = query.filter(Indicacao.data_indicacao <= datetime.strptime(data_fim, '%Y-%m-%d').date())
-            if indicador_id:
-                query = query.filter(Indicacao.indicador_id == indicador_id)
-            
-            indicacoes = query.order_by(Indicacao.data_indicacao.desc()).all()
-            
-            # Headers
-            headers = [
-                'Data', 'Indicador', 'Empresa', 'Tel. Indicador', 'Nome Indicado', 
-                'Tel. Indicado', 'Gerou Venda', 'Faturamento', 'Status Recompensa', 'Observações'
-            ]
-            
-            for col, header in enumerate(headers, 1):
-                cell = ws_indicacoes.cell(row=1, column=col, value=header)
-                cell.font = header_font
-                cell.fill = header_fill
-                cell.border = border
-                cell.alignment = Alignment(horizontal='center')
-            
-            # Dados
-            for row, indicacao in enumerate(indicacoes, 2):
-                ws_indicacoes.cell(row=row, column=1, value=indicacao.data_indicacao.strftime('%d/%m/%Y'))
-                ws_indicacoes.cell(row=row, column=2, value=indicacao.indicador_nome)
-                ws_indicacoes.cell(row=row, column=3, value=indicacao.indicador_empresa or '')
-                ws_indicacoes.cell(row=row, column=4, value=format_phone(indicacao.indicador_telefone))
-                ws_indicacoes.cell(row=row, column=5, value=indicacao.nome_indicado)
-                ws_indicacoes.cell(row=row, column=6, value=format_phone(indicacao.telefone_indicado))
-                ws_indicacoes.cell(row=row, column=7, value='Sim' if indicacao.gerou_venda else 'Não')
-                ws_indicacoes.cell(row=row, column=8, value=format_currency(indicacao.faturamento_gerado))
-                ws_indicacoes.cell(row=row, column=9, value=indicacao.status_recompensa.value)
-                ws_indicacoes.cell(row=row, column=10, value=indicacao.observacoes or '')
-                
-                # Aplicar bordas
-                for col in range(1, 11):
-                    ws_indicacoes.cell(row=row, column=col).border = border
-            
-            # Ajustar largura das colunas
-            column_widths = [12, 25, 20, 15, 25, 15, 12, 15, 18, 30]
-            for col, width in enumerate(column_widths, 1):
-                ws_indicacoes.column_dimensions[get_column_letter(col)].width = width
+        if _exportacao_assincrona():
+            return _agendar_exportacao('parquet', tipo_relatorio, data_inicio, data_fim, indicador_id)
         
-        if tipo_relatorio in ['completo', 'indicadores']:
-            # Aba 2: Performance por Indicador
-            if tipo_relatorio == 'completo':
-                ws_performance = wb.create_sheet(title="Performance Indicadores")
-            else:
-                ws_performance = wb.active
-                ws_performance.title = "Performance Indicadores"
-            
-            # Query de performance
-            query = db.session.query(
-                Indicador.nome,
-                Indicador.empresa,
-                Indicador.telefone,
-                Indicador.email,
-                func.count(Indicacao.id).label('total_indicacoes'),
-                func.sum(func.case((Indicacao.gerou_venda == True, 1), else_=0)).label('total_vendas'),
-                func.sum(func.case((Indicacao.gerou_venda == True, Indicacao.faturamento_gerado), else_=0)).label('faturamento_total')
-            ).outerjoin(Indicacao).group_by(Indicador.id)
-            
-            # Aplicar filtros de data
-            if data_inicio or data_fim:
-                if data_inicio:
-                    query = query.filter(or_(
-                        Indicacao.data_indicacao >= datetime.strptime(data_inicio, '%Y-%m-%d').date(),
-                        Indicacao.id.is_(None)
-                    ))
-                if data_fim:
-                    query = query.filter(or_(
-                        Indicacao.data_indicacao <= datetime.strptime(data_fim, '%Y-%m-%d').date(),
-                        Indicacao.id.is_(None)
-                    ))
-            
-            performance = query.order_by(func.sum(func.case((Indicacao.gerou_venda == True, Indicacao.faturamento_gerado), else_=0)).desc()).all()
-            
-            # Headers
-            headers = [
-                'Nome', 'Empresa', 'Telefone', 'Email', 'Total Indicações', 
-                'Total Vendas', 'Taxa Conversão (%)', 'Faturamento Total'
-            ]
-            
-            for col, header in enumerate(headers, 1):
-                cell = ws_performance.cell(row=1, column=col, value=header)
-                cell.font = header_font
-                cell.fill = header_fill
-                cell.border = border
-                cell.alignment = Alignment(horizontal='center')
-            
-            # Dados
-            for row, indicador in enumerate(performance, 2):
-                total_indicacoes = indicador.total_indicacoes or 0
-                total_vendas = indicador.total_vendas or 0
-                faturamento_total = indicador.faturamento_total or 0
-                taxa_conversao = (total_vendas / total_indicacoes * 100) if total_indicacoes > 0 else 0
-                
-                ws_performance.cell(row=row, column=1, value=indicador.nome)
-                ws_performance.cell(row=row, column=2, value=indicador.empresa or '')
-                ws_performance.cell(row=row, column=3, value=format_phone(indicador.telefone))
-                ws_performance.cell(row=row, column=4, value=indicador.email or '')
-                ws_performance.cell(row=row, column=5, value=total_indicacoes)
-                ws_performance.cell(row=row, column=6, value=total_vendas)
-                ws_performance.cell(row=row, column=7, value=f"{taxa_conversao:.1f}%")
-                ws_performance.cell(row=row, column=8, value=format_currency(faturamento_total))
-                
-                # Aplicar bordas
-                for col in range(1, 9):
-                    ws_performance.cell(row=row, column=col).border = border
-            
-            # Ajustar largura das colunas
-            column_widths = [25, 20, 15, 25, 15, 12, 15, 18]
-            for col, width in enumerate(column_widths, 1):
-                ws_performance.column_dimensions[get_column_letter(col)].width = width
+        def gerar():
+            buffer = io.BytesIO()
+            extensao = escrever_relatorio_parquet(buffer, tipo_relatorio, data_inicio, data_fim, indicador_id)
+            mimetype = 'application/zip' if extensao == 'zip' else 'application/vnd.apache.parquet'
+            return Artefato(buffer.getvalue(), extensao, mimetype)
         
-        # Salvar em arquivo temporário
-        temp_file = tempfile.NamedTemporaryFile(delete=False, suffix='.xlsx')
-        wb.save(temp_file.name)
-        temp_file.close()
+        return _enviar_exportacao(('parquet', tipo_relatorio, data_inicio, data_fim, indicador_id),
+                                  gerar, tipo_relatorio, data_inicio, data_fim)
         
-        # Nome do arquivo baseado no tipo e filtros
-        filename = f"relatorio_{tipo_relatorio}"
-        if data_inicio and data_fim:
-            filename += f"_{data_inicio}_a_{data_fim}"
-        elif data_inicio:
-            filename += f"_desde_{data_inicio}"
-        elif data_fim:
-            filename += f"_ate_{data_fim}"
-        filename += f"_{datetime.now().strftime('%Y%m%d_%H%M%S')}.xlsx"
+    except Exception as e:
+        return jsonify({'error': str(e)}), 500
+
+@relatorios_bp.route('/export/jobs/<uuid:job_id>', methods=['GET'])
+def get_export_job(job_id):
+    """Status e progresso de uma exportação em segundo plano"""
+    try:
+        job = db.session.get(ExportJob, job_id)
+        if job is None:
+            return jsonify({'error': 'Job de exportação não encontrado'}), 404
+        # Worker morto: o job volta para a fila em vez de ficar "processando" para sempre
+        if job.status == StatusJob.PROCESSANDO:
+            if reenfileirar_exportacoes_abandonadas(current_app._get_current_object()):
+                db.session.refresh(job)
+        return jsonify(job.to_dict())
+    except Exception as e:
+        return jsonify({'error': str(e)}), 500
+
+@relatorios_bp.route('/export/jobs/<uuid:job_id>/download', methods=['GET'])
+def download_export_job(job_id):
+    """Baixa o arquivo gerado por uma exportação em segundo plano"""
+    try:
+        job = db.session.get(ExportJob, job_id)
+        if job is None:
+            return jsonify({'error': 'Job de exportação não encontrado'}), 404
+        if job.status != StatusJob.CONCLUIDO:
+            return jsonify({'error': 'Exportação ainda não concluída', 'status': job.status.value}), 409
+        if job.expirado or not job.caminho_arquivo:
+            return jsonify({'error': 'Arquivo da exportação expirado'}), 410
         
         return send_file(
-            temp_file.name,
+            job.caminho_arquivo,
             as_attachment=True,
-            download_name=filename,
-            mimetype='application/vnd.openxmlformats-officedocument.spreadsheetml.sheet'
+            download_name=job.nome_arquivo,
+            mimetype=job.mimetype
         )
-        
+    except FileNotFoundError:
+        return jsonify({'error': 'Arquivo da exportação expirado'}), 410
     except Exception as e:
         return jsonify({'error': str(e)}), 500
-    finally:
-        # Limpar arquivo temporário
-        try:
-            if 'temp_file' in locals():
-                os.unlink(temp_file.name)
-        except:
-            pass
 
+def _exportacao_em_streaming(gerador, extensao, mimetype):
+    """Resposta enviada em blocos enquanto a consulta é percorrida"""
+    data_inicio = request.args.get('data_inicio')
+    data_fim = request.args.get('data_fim')
+    indicador_id = request.args.get('indicador_id')
+    
+    # Valida os filtros antes de começar a enviar a resposta
+    query = query_indicacoes_completas(data_inicio, data_fim, indicador_id)
+    
+    filename = nome_arquivo_relatorio('indicacoes', data_inicio, data_fim, extensao)
+    return Response(
+        stream_with_context(gerador(query)),
+        mimetype=mimetype,
+        headers={'Content-Disposition': f'attachment; filename={filename}'}
+    )
+
+@relatorios_bp.route('/export/csv', methods=['GET'])
+def export_csv():
+    """Exporta indicações com dados do indicador em CSV, em streaming"""
+    try:
+        return _exportacao_em_streaming(gerar_csv, 'csv', 'text/csv')
+    except Exception as e:
+        return jsonify({'error': str(e)}), 500
+
+@relatorios_bp.route('/export/ndjson', methods=['GET'])
+def export_ndjson():
+    """Exporta indicações com dados do indicador em NDJSON, em streaming"""
+    try:
+        return _exportacao_em_streaming(gerar_ndjson, 'ndjson', 'application/x-ndjson')
+    except Exception as e:
+        return jsonify({'error': str(e)}), 500
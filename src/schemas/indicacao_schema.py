@@ -1,12 +1,14 @@
 from marshmallow import Schema, fields, validate, pre_load, post_load, ValidationError
 from marshmallow_sqlalchemy import SQLAlchemyAutoSchema
+from src.models.user import db
 from src.models.indicacao import Indicacao, StatusRecompensa
 from datetime import datetime
-import phonenumbers
+from src.services.telefone import normalizar_telefone
 
 class IndicacaoSchema(SQLAlchemyAutoSchema):
     class Meta:
         model = Indicacao
+        sqla_session = db.session
         load_instance = True
         include_fk = True
     
@@ -27,12 +29,8 @@ class IndicacaoSchema(SQLAlchemyAutoSchema):
         # Normalizar telefone
         if 'telefone_indicado' in data:
             try:
-                parsed = phonenumbers.parse(data['telefone_indicado'], 'BR')
-                if phonenumbers.is_valid_number(parsed):
-                    data['telefone_indicado'] = phonenumbers.format_number(parsed, phonenumbers.PhoneNumberFormat.E164)
-                else:
-                    raise ValidationError("Telefone do indicado inválido")
-            except:
+                data['telefone_indicado'] = normalizar_telefone(data['telefone_indicado'])
+            except ValueError:
                 raise ValidationError("Não foi possível normalizar o telefone do indicado")
         
         # Validar data não futura
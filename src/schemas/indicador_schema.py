@@ -1,11 +1,13 @@
 from marshmallow import Schema, fields, validate, pre_load
 from marshmallow_sqlalchemy import SQLAlchemyAutoSchema
+from src.models.user import db
 from src.models.indicador import Indicador
-import phonenumbers
+from src.services.telefone import normalizar_telefone
 
 class IndicadorSchema(SQLAlchemyAutoSchema):
     class Meta:
         model = Indicador
+        sqla_session = db.session
         load_instance = True
         include_fk = True
     
@@ -20,15 +22,8 @@ class IndicadorSchema(SQLAlchemyAutoSchema):
     @pre_load
     def normalize_phone(self, data, **kwargs):
         if 'telefone' in data:
-            try:
-                # Normalizar telefone para formato E.164 brasileiro
-                parsed = phonenumbers.parse(data['telefone'], 'BR')
-                if phonenumbers.is_valid_number(parsed):
-                    data['telefone'] = phonenumbers.format_number(parsed, phonenumbers.PhoneNumberFormat.E164)
-                else:
-                    raise ValueError("Telefone inválido")
-            except:
-                raise ValueError("Não foi possível normalizar o telefone")
+            # Normalizar telefone para formato E.164 brasileiro
+            data['telefone'] = normalizar_telefone(data['telefone'])
         return data
 
 indicador_schema = IndicadorSchema()
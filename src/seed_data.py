@@ -10,10 +10,14 @@ import random
 # Adiciona o diretório raiz do projeto ao PATH
 sys.path.insert(0, os.path.dirname(os.path.dirname(__file__)))
 
-from src.main import app
+from src.main import app, inicializar
 from src.models.user import db
 from src.models.indicador import Indicador
 from src.models.indicacao import Indicacao, StatusRecompensa
+from src.models.import_fingerprint import ImportFingerprint
+from src.models.rollup_diario import RollupDiario
+from src.models.telefone_busca import TelefoneBusca
+from src.services.busca import reconstruir_indice_busca
 
 # Dados de exemplo para indicadores
 INDICADORES_EXEMPLO = [
@@ -188,6 +192,7 @@ def criar_indicacoes(indicadores):
 
 def main():
     """Função principal para popular o banco de dados"""
+    inicializar(app, retomar_jobs=False)
     with app.app_context():
         print("🌱 Populando banco de dados com dados de exemplo...")
         
@@ -196,9 +201,13 @@ def main():
             resposta = input("⚠️  Já existem dados no banco. Deseja limpar e recriar? (s/N): ")
             if resposta.lower() in ['s', 'sim', 'y', 'yes']:
                 print("🗑️  Limpando dados existentes...")
+                ImportFingerprint.query.delete()
+                RollupDiario.query.delete()
+                TelefoneBusca.query.delete()
                 Indicacao.query.delete()
                 Indicador.query.delete()
                 db.session.commit()
+                reconstruir_indice_busca()
             else:
                 print("❌ Operação cancelada")
                 return
@@ -0,0 +1,117 @@
+from datetime import datetime
+from flask import current_app
+from src.models.user import db
+from src.models.indicacao import Indicacao
+from src.models.import_fingerprint import ImportFingerprint
+from src.models.rollup_diario import contribuicao, acumular, novas_variacoes, aplicar_variacoes
+from src.models.telefone_busca import indexar_telefones, INDICACAO
+from src.services.busca import indexar_indicacoes
+
+TAMANHO_CHUNK_PADRAO = 1000
+
+
+def tamanho_chunk_configurado(valor=None):
+    """Tamanho de chunk pedido na requisição ou configurado na aplicação"""
+    if valor:
+        return max(1, int(valor))
+    return current_app.config.get('IMPORT_CHUNK_SIZE', TAMANHO_CHUNK_PADRAO)
+
+
+class IndicacaoBulkWriter:
+    """Grava indicações com INSERT em lote (Core executemany) e commit por chunk
+
+    Cada chunk é uma transação independente: uma falha desfaz apenas o chunk
+    atual e as linhas dele são registradas em `falhas`. Os fingerprints de
+    importação, quando informados, o rollup diário e os índices de busca são
+    gravados na mesma transação. `ao_gravar`, se informado, é chamado depois
+    de cada chunk, gravado ou não.
+    """
+
+    def __init__(self, tamanho_chunk=TAMANHO_CHUNK_PADRAO, session=None, ao_gravar=None):
+        self.tamanho_chunk = tamanho_chunk
+        self.session = session or db.session
+        self.ao_gravar = ao_gravar
+        self.chunks = []
+        self.falhas = {}
+        self.linhas_criadas = 0
+        self._linhas = []
+        self._registros = []
+        self._fingerprints = []
+
+    def adicionar(self, linha, registro, fingerprint=None):
+        self._linhas.append(linha)
+        self._registros.append(registro)
+        if fingerprint is not None:
+            self._fingerprints.append({
+                'fingerprint': fingerprint,
+                'indicacao_id': registro['id'],
+                'created_at': datetime.utcnow()
+            })
+        if len(self._registros) >= self.tamanho_chunk:
+            self.descarregar()
+
+    def adicionar_varios(self, linhas, registros, fingerprints=None):
+        if fingerprints is None:
+            fingerprints = [None] * len(registros)
+        for linha, registro, fingerprint in zip(linhas, registros, fingerprints):
+            self.adicionar(linha, registro, fingerprint)
+
+    def descarregar(self):
+        """Grava o buffer atual como um chunk"""
+        if not self._registros:
+            return
+
+        linhas, registros, fingerprints = self._linhas, self._registros, self._fingerprints
+        self._linhas, self._registros, self._fingerprints = [], [], []
+
+        chunk = {
+            'numero': len(self.chunks) + 1,
+            'linha_inicial': linhas[0] + 1,
+            'linha_final': linhas[-1] + 1,
+            'registros': len(registros),
+            'gravado': False
+        }
+
+        try:
+            self.session.execute(Indicacao.__table__.insert(), registros)
+            if fingerprints:
+                self.session.execute(ImportFingerprint.__table__.insert(), fingerprints)
+            # O INSERT em lote não dispara os eventos do ORM que mantêm o rollup e as buscas
+            aplicar_variacoes(self.session.connection(), self._variacoes_rollup(registros))
+            indexar_indicacoes(self.session.connection(), [
+                (registro['id'], registro['nome_indicado'], registro.get('observacoes'))
+                for registro in registros
+            ])
+            indexar_telefones(self.session.connection(), INDICACAO, [
+                (registro['id'], registro['telefone_indicado']) for registro in registros
+            ])
+            self.session.commit()
+            chunk['gravado'] = True
+            self.linhas_criadas += len(registros)
+        except Exception as e:
+            self.session.rollback()
+            chunk['erro'] = str(e)
+            for linha in linhas:
+                self.falhas[linha] = f"Erro ao gravar chunk {chunk['numero']}: {str(e)}"
+
+        self.chunks.append(chunk)
+        if self.ao_gravar:
+            self.ao_gravar()
+
+    @staticmethod
+    def _variacoes_rollup(registros):
+        variacoes = novas_variacoes()
+        for registro in registros:
+            acumular(variacoes, *contribuicao(
+                registro['indicador_id'], registro['data_indicacao'], registro['status_recompensa'],
+                registro['gerou_venda'], registro['faturamento_gerado']
+            ))
+        return variacoes
+
+    def finalizar(self):
+        self.descarregar()
+        return self.chunks
+
+    @property
+    def chunks_gravados(self):
+        return [chunk['numero'] for chunk in self.chunks if chunk['gravado']]
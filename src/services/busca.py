@@ -0,0 +1,206 @@
+import re
+from sqlalchemy import event, text, select, union_all, func, literal_column, table, column, String
+from sqlalchemy.orm import attributes
+from sqlalchemy.exc import OperationalError
+from src.models.user import db
+from src.models.indicador import Indicador
+from src.models.indicacao import Indicacao
+from src.services.busca_telefone import filtro_telefone_indicacoes, filtro_telefone_indicadores, busca_por_telefone
+
+# Índice de texto completo (SQLite FTS5): sem acentos, sem caixa e com índice de prefixos
+TOKENIZADOR = 'unicode61 remove_diacritics 2'
+
+busca_indicacoes = table('busca_indicacoes', column('rowid'), column('id', String),
+                         column('nome_indicado'), column('observacoes'))
+busca_indicadores = table('busca_indicadores', column('rowid'), column('id', String), column('nome'))
+
+# Definido por criar_indice_busca() na inicialização
+_disponivel = False
+
+
+def busca_disponivel():
+    """FTS5 só existe no SQLite; nos demais bancos a busca continua com ilike"""
+    return _disponivel
+
+
+def _rowid(id_):
+    # Rowid estável derivado do UUID: atualizações e exclusões acessam a linha pela chave
+    return id_.int & 0x7FFFFFFFFFFFFFFF
+
+
+def expressao_busca(termo):
+    """Termo digitado -> consulta FTS5 com prefixo em cada palavra ("isis"* "ferr"*)"""
+    palavras = re.findall(r'\w+', termo or '')
+    if not palavras:
+        return None
+    return ' '.join(f'"{palavra}"*' for palavra in palavras)
+
+
+def parece_telefone(termo):
+    return bool(re.fullmatch(r'[\d\s()+\-.]+', termo.strip())) and busca_por_telefone(termo)
+
+
+def indexar_indicacoes(connection, linhas):
+    """linhas: (id, nome_indicado, observacoes)"""
+    if not busca_disponivel():
+        return
+    parametros = [
+        {'rowid': _rowid(id_), 'id': id_.hex, 'nome_indicado': nome, 'observacoes': observacoes}
+        for id_, nome, observacoes in linhas
+    ]
+    if parametros:
+        connection.execute(text(
+            'INSERT OR REPLACE INTO busca_indicacoes (rowid, id, nome_indicado, observacoes) '
+            'VALUES (:rowid, :id, :nome_indicado, :observacoes)'
+        ), parametros)
+
+
+def indexar_indicadores(connection, linhas):
+    """linhas: (id, nome)"""
+    if not busca_disponivel():
+        return
+    parametros = [{'rowid': _rowid(id_), 'id': id_.hex, 'nome': nome} for id_, nome in linhas]
+    if parametros:
+        connection.execute(text(
+            'INSERT OR REPLACE INTO busca_indicadores (rowid, id, nome) VALUES (:rowid, :id, :nome)'
+        ), parametros)
+
+
+def _remover(connection, tabela, id_):
+    if busca_disponivel():
+        connection.execute(text(f'DELETE FROM {tabela} WHERE rowid = :rowid'), {'rowid': _rowid(id_)})
+
+
+def criar_indice_busca(session=None):
+    """Cria as tabelas FTS5 (se preciso) e as popula quando estão vazias"""
+    global _disponivel
+    session = session or db.session
+    connection = session.connection()
+    if connection.dialect.name != 'sqlite':
+        _disponivel = False
+        return
+    try:
+        for tabela, colunas in (('busca_indicacoes', 'id UNINDEXED, nome_indicado, observacoes'),
+                                ('busca_indicadores', 'id UNINDEXED, nome')):
+            connection.execute(text(
+                f"CREATE VIRTUAL TABLE IF NOT EXISTS {tabela} USING fts5("
+                f"{colunas}, tokenize = '{TOKENIZADOR}', prefix = '2 3')"
+            ))
+    except OperationalError:
+        # SQLite compilado sem FTS5
+        session.rollback()
+        _disponivel = False
+        return
+    session.commit()
+    _disponivel = True
+
+    vazio = session.execute(text('SELECT NOT EXISTS (SELECT 1 FROM busca_indicacoes)')).scalar()
+    if vazio and session.scalar(select(func.count(Indicacao.id))):
+        reconstruir_indice_busca(session)
+
+
+def reconstruir_indice_busca(session=None):
+    """Recria o conteúdo do índice a partir das tabelas de indicações e indicadores"""
+    session = session or db.session
+    if not busca_disponivel():
+        return 0
+    connection = session.connection()
+    connection.execute(text('DELETE FROM busca_indicacoes'))
+    connection.execute(text('DELETE FROM busca_indicadores'))
+    indexar_indicacoes(connection, session.execute(
+        select(Indicacao.id, Indicacao.nome_indicado, Indicacao.observacoes)
+    ).all())
+    indexar_indicadores(connection, session.execute(select(Indicador.id, Indicador.nome)).all())
+    session.commit()
+    return session.execute(text('SELECT count(*) FROM busca_indicacoes')).scalar()
+
+
+def _correspondencia(tabela, expressao):
+    return literal_column(tabela.name).op('MATCH')(expressao)
+
+
+def _ranking_indicadores(expressao):
+    return select(
+        busca_indicadores.c.id.label('id'),
+        literal_column('bm25(busca_indicadores)').label('rank')
+    ).where(_correspondencia(busca_indicadores, expressao))
+
+
+def buscar_indicacoes(query, termo):
+    """Aplica a busca textual à query de indicações, ordenando pela relevância
+
+    Procura em nome do indicado, observações e nome do indicador. Termos que
+    parecem telefone procuram nos telefones do indicado e do indicador; bancos
+    sem FTS5 usam a comparação por substring nos nomes.
+    """
+    if parece_telefone(termo):
+        return query.filter(filtro_telefone_indicacoes(termo))
+    expressao = expressao_busca(termo)
+    if expressao is None or not busca_disponivel():
+        return query.filter(
+            (Indicacao.nome_indicado.ilike(f'%{termo}%')) |
+            (Indicador.nome.ilike(f'%{termo}%'))
+        )
+
+    pelo_indicador = _ranking_indicadores(expressao).subquery()
+    correspondencias = union_all(
+        select(
+            busca_indicacoes.c.id.label('id'),
+            literal_column('bm25(busca_indicacoes)').label('rank')
+        ).where(_correspondencia(busca_indicacoes, expressao)),
+        select(Indicacao.id, pelo_indicador.c.rank)
+        .join(pelo_indicador, Indicacao.indicador_id == pelo_indicador.c.id)
+    ).subquery()
+    ranking = select(
+        correspondencias.c.id, func.min(correspondencias.c.rank).label('rank')
+    ).group_by(correspondencias.c.id).subquery()
+
+    return query.join(ranking, Indicacao.id == ranking.c.id).order_by(ranking.c.rank, Indicacao.id)
+
+
+def buscar_indicadores(query, termo):
+    """Aplica a busca por nome (ou telefone) à query de indicadores, ordenando pela relevância"""
+    if parece_telefone(termo):
+        return query.filter(filtro_telefone_indicadores(termo))
+    expressao = expressao_busca(termo)
+    if expressao is None or not busca_disponivel():
+        return query.filter(Indicador.nome.ilike(f'%{termo}%'))
+
+    ranking = _ranking_indicadores(expressao).subquery()
+    return query.join(ranking, Indicador.id == ranking.c.id).order_by(ranking.c.rank, Indicador.id)
+
+
+def _alterado(objeto, *campos):
+    return any(attributes.get_history(objeto, campo).has_changes() for campo in campos)
+
+
+@event.listens_for(Indicacao, 'after_insert')
+def _indexar_indicacao(mapper, connection, target):
+    indexar_indicacoes(connection, [(target.id, target.nome_indicado, target.observacoes)])
+
+
+@event.listens_for(Indicacao, 'after_update')
+def _reindexar_indicacao(mapper, connection, target):
+    if _alterado(target, 'nome_indicado', 'observacoes'):
+        _indexar_indicacao(mapper, connection, target)
+
+
+@event.listens_for(Indicacao, 'after_delete')
+def _remover_indicacao(mapper, connection, target):
+    _remover(connection, 'busca_indicacoes', target.id)
+
+
+@event.listens_for(Indicador, 'after_insert')
+def _indexar_indicador(mapper, connection, target):
+    indexar_indicadores(connection, [(target.id, target.nome)])
+
+
+@event.listens_for(Indicador, 'after_update')
+def _reindexar_indicador(mapper, connection, target):
+    if _alterado(target, 'nome'):
+        _indexar_indicador(mapper, connection, target)
+
+
+@event.listens_for(Indicador, 'after_delete')
+def _remover_indicador(mapper, connection, target):
+    _remover(connection, 'busca_indicadores', target.id)
@@ -0,0 +1,69 @@
+from sqlalchemy import select, insert, exists, or_, union
+from src.models.user import db
+from src.models.indicador import Indicador
+from src.models.indicacao import Indicacao
+from src.models.telefone_busca import TelefoneBusca, INDICACAO, INDICADOR, somente_digitos, formas_telefone
+
+# Sucessor de '9' na ordem dos caracteres: [prefixo, prefixo + ':') cobre os que começam com o prefixo
+FIM_DIGITOS = ':'
+
+# Menos que isso (ex.: só "+55") o prefixo casaria com todos os telefones
+MINIMO_DIGITOS = 2
+
+
+def _comeca_com(coluna, prefixo):
+    # Faixa explícita em vez de LIKE, que no SQLite não usa índice com a colação padrão
+    return (coluna >= prefixo) & (coluna < prefixo + FIM_DIGITOS)
+
+
+def busca_por_telefone(termo):
+    """Termo com dígitos suficientes, sem o código do país, para filtrar telefones"""
+    return len(somente_digitos(termo)) >= MINIMO_DIGITOS
+
+
+def registros_por_telefone(entidade, termo):
+    """SELECT dos ids cujo telefone começa ou termina com os dígitos do termo
+
+    "(11) 9" e "119" procuram a partir do DDD, "98765" também no número sem
+    DDD e "4321" no final. Cada parte do UNION é uma faixa em um índice próprio
+    (com OR o planejador do SQLite prefere varrer a entidade inteira).
+    """
+    digitos = somente_digitos(termo)
+    return union(*[
+        select(TelefoneBusca.registro_id).where(TelefoneBusca.entidade == entidade, _comeca_com(coluna, prefixo))
+        for coluna, prefixo in ((TelefoneBusca.digitos, digitos),
+                                (TelefoneBusca.numero, digitos),
+                                (TelefoneBusca.reverso, digitos[::-1]))
+    ])
+
+
+def filtro_telefone_indicacoes(termo):
+    """Indicações cujo telefone, ou o do indicador, corresponde ao termo"""
+    return or_(
+        Indicacao.id.in_(registros_por_telefone(INDICACAO, termo)),
+        Indicacao.indicador_id.in_(registros_por_telefone(INDICADOR, termo))
+    )
+
+
+def filtro_telefone_indicadores(termo):
+    return Indicador.id.in_(registros_por_telefone(INDICADOR, termo))
+
+
+def reconstruir_telefones(session=None):
+    """Recria as formas de todos os telefones a partir de indicações e indicadores"""
+    session = session or db.session
+    session.execute(TelefoneBusca.__table__.delete())
+    for entidade, coluna_id, coluna_telefone in ((INDICACAO, Indicacao.id, Indicacao.telefone_indicado),
+                                                 (INDICADOR, Indicador.id, Indicador.telefone)):
+        linhas = session.execute(select(coluna_id, coluna_telefone)).all()
+        if linhas:
+            session.execute(insert(TelefoneBusca), [formas_telefone(entidade, *linha) for linha in linhas])
+    session.commit()
+    return session.query(TelefoneBusca).count()
+
+
+def telefones_precisam_reconstrucao(session=None):
+    """Tabela vazia com indicadores gravados (banco anterior à criação da tabela)"""
+    session = session or db.session
+    return session.scalar(select(exists().where(Indicador.id.isnot(None)))) and \
+        not session.scalar(select(exists().where(TelefoneBusca.registro_id.isnot(None))))
@@ -0,0 +1,81 @@
+import time
+import threading
+from collections import OrderedDict
+
+
+class CacheVersionado:
+    """Cache LRU limitado em entradas e em bytes, com TTL opcional
+
+    Cada entrada é guardada junto com a versão dos dados usada para gerá-la;
+    quando a versão muda, as entradas antigas deixam de ser servidas e são
+    descartadas na próxima gravação.
+    """
+
+    def __init__(self, maximo_entradas, maximo_bytes, ttl=None, tamanho=len):
+        self.maximo_entradas = maximo_entradas
+        self.maximo_bytes = maximo_bytes
+        self.ttl = ttl
+        self.tamanho = tamanho
+        self.tamanho_bytes = 0
+        self.acertos = 0
+        self.falhas = 0
+        self.expiradas = 0
+        self.removidas = 0
+        self._entradas = OrderedDict()  # (chave, versão) -> (valor, expira_em)
+        self._lock = threading.Lock()
+
+    def obter(self, chave, versao):
+        with self._lock:
+            entrada = self._entradas.get((chave, versao))
+            if entrada is not None and entrada[1] is not None and entrada[1] <= time.monotonic():
+                self._remover((chave, versao))
+                self.expiradas += 1
+                entrada = None
+            if entrada is None:
+                self.falhas += 1
+                return None
+            self._entradas.move_to_end((chave, versao))
+            self.acertos += 1
+            return entrada[0]
+
+    def guardar(self, chave, versao, valor):
+        tamanho = self.tamanho(valor)
+        if tamanho > self.maximo_bytes:
+            return
+        with self._lock:
+            if any(k[1] > versao for k in self._entradas):
+                return  # gerado com dados que já mudaram
+            # Entradas de versões anteriores nunca mais serão lidas
+            for antiga in [k for k in self._entradas if k[1] < versao]:
+                self._remover(antiga)
+            if (chave, versao) in self._entradas:
+                self._remover((chave, versao))
+
+            expira_em = time.monotonic() + self.ttl if self.ttl else None
+            self._entradas[(chave, versao)] = (valor, expira_em)
+            self.tamanho_bytes += tamanho
+            while len(self._entradas) > self.maximo_entradas or self.tamanho_bytes > self.maximo_bytes:
+                self._remover(next(iter(self._entradas)))
+                self.removidas += 1
+
+    def _remover(self, chave):
+        valor, _ = self._entradas.pop(chave)
+        self.tamanho_bytes -= self.tamanho(valor)
+
+    def limpar(self):
+        with self._lock:
+            self._entradas.clear()
+            self.tamanho_bytes = 0
+
+    def estatisticas(self):
+        with self._lock:
+            consultas = self.acertos + self.falhas
+            return {
+                'entradas': len(self._entradas),
+                'tamanho_bytes': self.tamanho_bytes,
+                'acertos': self.acertos,
+                'falhas': self.falhas,
+                'taxa_acerto': round(self.acertos / consultas * 100, 1) if consultas else 0,
+                'expiradas': self.expiradas,
+                'removidas': self.removidas
+            }
@@ -0,0 +1,134 @@
+from openpyxl import Workbook
+from openpyxl.cell import WriteOnlyCell
+from openpyxl.styles import NamedStyle, Font, PatternFill, Alignment, Border, Side
+from openpyxl.utils import get_column_letter
+from src.services.formatacao import format_currency, format_phone
+from src.services.relatorio_queries import query_indicacoes, query_performance
+
+TAMANHO_LOTE = 1000  # linhas buscadas por vez no banco
+
+CABECALHO_INDICACOES = [
+    'Data', 'Indicador', 'Empresa', 'Tel. Indicador', 'Nome Indicado',
+    'Tel. Indicado', 'Gerou Venda', 'Faturamento', 'Status Recompensa', 'Observações'
+]
+LARGURAS_INDICACOES = [12, 25, 20, 15, 25, 15, 12, 15, 18, 30]
+
+CABECALHO_PERFORMANCE = [
+    'Nome', 'Empresa', 'Telefone', 'Email', 'Total Indicações',
+    'Total Vendas', 'Taxa Conversão (%)', 'Faturamento Total'
+]
+LARGURAS_PERFORMANCE = [25, 20, 15, 25, 15, 12, 15, 18]
+
+
+def _estilos():
+    """Estilos nomeados compartilhados por todas as células do relatório"""
+    borda = Border(
+        left=Side(style='thin'),
+        right=Side(style='thin'),
+        top=Side(style='thin'),
+        bottom=Side(style='thin')
+    )
+    cabecalho = NamedStyle(
+        name='cabecalho',
+        font=Font(bold=True, color="FFFFFF"),
+        fill=PatternFill(start_color="7C3AED", end_color="7C3AED", fill_type="solid"),
+        border=borda,
+        alignment=Alignment(horizontal='center')
+    )
+    celula = NamedStyle(name='celula', border=borda)
+    return cabecalho, celula
+
+
+class _Aba:
+    """Aba em modo write_only; as linhas são gravadas em disco conforme chegam"""
+
+    def __init__(self, wb, titulo, cabecalho, larguras):
+        self.ws = wb.create_sheet(title=titulo)
+        # Larguras precisam ser definidas antes da primeira linha
+        for col, largura in enumerate(larguras, 1):
+            self.ws.column_dimensions[get_column_letter(col)].width = largura
+        self._linha(cabecalho, 'cabecalho')
+
+    def _linha(self, valores, estilo):
+        celulas = []
+        for valor in valores:
+            celula = WriteOnlyCell(self.ws, value=valor)
+            celula.style = estilo
+            celulas.append(celula)
+        self.ws.append(celulas)
+
+    def append(self, valores):
+        self._linha(valores, 'celula')
+
+
+def linha_indicacao(indicacao):
+    return [
+        indicacao.data_indicacao.strftime('%d/%m/%Y'),
+        indicacao.indicador_nome,
+        indicacao.indicador_empresa or '',
+        format_phone(indicacao.indicador_telefone),
+        indicacao.nome_indicado,
+        format_phone(indicacao.telefone_indicado),
+        'Sim' if indicacao.gerou_venda else 'Não',
+        format_currency(indicacao.faturamento_gerado),
+        indicacao.status_recompensa.value,
+        indicacao.observacoes or ''
+    ]
+
+
+def linha_performance(indicador):
+    total_indicacoes = indicador.total_indicacoes or 0
+    total_vendas = indicador.total_vendas or 0
+    faturamento_total = indicador.faturamento_total or 0
+    taxa_conversao = (total_vendas / total_indicacoes * 100) if total_indicacoes > 0 else 0
+
+    return [
+        indicador.nome,
+        indicador.empresa or '',
+        format_phone(indicador.telefone),
+        indicador.email or '',
+        total_indicacoes,
+        total_vendas,
+        f"{taxa_conversao:.1f}%",
+        format_currency(faturamento_total)
+    ]
+
+
+def escrever_relatorio_excel(destino, tipo_relatorio='completo', data_inicio=None, data_fim=None,
+                             indicador_id=None, tamanho_lote=TAMANHO_LOTE, ao_progredir=None):
+    """Gera o relatório em `destino` (caminho ou arquivo) com memória constante
+
+    O workbook é write_only e as linhas vêm do banco com yield_per, então só um
+    lote de resultados fica em memória por vez, qualquer que seja o período.
+    `ao_progredir(linhas_escritas)` é chamado a cada lote, se informado.
+    """
+    linhas_escritas = 0
+
+    def contar():
+        nonlocal linhas_escritas
+        linhas_escritas += 1
+        if ao_progredir and linhas_escritas % tamanho_lote == 0:
+            ao_progredir(linhas_escritas)
+
+    wb = Workbook(write_only=True)
+    for estilo in _estilos():
+        wb.add_named_style(estilo)
+
+    if tipo_relatorio in ['completo', 'indicacoes']:
+        aba = _Aba(wb, "Indicações", CABECALHO_INDICACOES, LARGURAS_INDICACOES)
+        for indicacao in query_indicacoes(data_inicio, data_fim, indicador_id).yield_per(tamanho_lote):
+            aba.append(linha_indicacao(indicacao))
+            contar()
+
+    if tipo_relatorio in ['completo', 'indicadores']:
+        aba = _Aba(wb, "Performance Indicadores", CABECALHO_PERFORMANCE, LARGURAS_PERFORMANCE)
+        for indicador in query_performance(data_inicio, data_fim).yield_per(tamanho_lote):
+            aba.append(linha_performance(indicador))
+            contar()
+
+    if not wb.worksheets:
+        wb.create_sheet()
+
+    wb.save(destino)
+    if ao_progredir:
+        ao_progredir(linhas_escritas)
@@ -0,0 +1,45 @@
+from collections import namedtuple
+from flask import current_app
+from src.services.versao_dados import versao_atual
+from src.services.cache_versionado import CacheVersionado
+
+MAXIMO_ENTRADAS = 32
+MAXIMO_BYTES = 64 * 1024 * 1024
+
+Artefato = namedtuple('Artefato', ['conteudo', 'extensao', 'mimetype'])
+
+_cache = None
+
+
+def cache_exportacoes():
+    """Cache LRU de arquivos exportados do processo, dimensionado pela configuração
+
+    A chave inclui a versão dos dados, então qualquer commit em indicações ou
+    indicadores invalida as entradas anteriores.
+    """
+    global _cache
+    if _cache is None:
+        _cache = CacheVersionado(
+            current_app.config.get('EXPORT_CACHE_MAX_ENTRIES', MAXIMO_ENTRADAS),
+            current_app.config.get('EXPORT_CACHE_MAX_BYTES', MAXIMO_BYTES),
+            tamanho=lambda artefato: len(artefato.conteudo)
+        )
+    return _cache
+
+
+def exportacao_em_cache(chave, gerar):
+    """Retorna (artefato, acerto); `gerar()` só é chamado quando não há entrada válida
+
+    A versão é lida antes de gerar: se houver um commit durante a geração, o
+    artefato fica associado à versão antiga e não será servido depois dele.
+    """
+    cache = cache_exportacoes()
+    versao = versao_atual()
+    artefato = cache.obter(chave, versao)
+    if artefato is not None:
+        return artefato, True
+
+    artefato = gerar()
+    if versao_atual() == versao:
+        cache.guardar(chave, versao, artefato)
+    return artefato, False
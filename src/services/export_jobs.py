@@ -0,0 +1,220 @@
+import os
+import uuid
+import tempfile
+from datetime import datetime, timedelta
+from concurrent.futures import ThreadPoolExecutor
+from sqlalchemy import update, select, func
+from src.models.user import db
+from src.models.import_job import StatusJob
+from src.models.export_job import ExportJob
+from src.services.excel_export import escrever_relatorio_excel
+from src.services.parquet_export import escrever_relatorio_parquet
+from src.services.formatacao import nome_arquivo_relatorio
+from src.services.relatorio_queries import parse_data, parse_uuid, query_indicacoes, query_performance
+from src.services.import_jobs import limite_sem_heartbeat
+
+MIMETYPES = {
+    'xlsx': 'application/vnd.openxmlformats-officedocument.spreadsheetml.sheet',
+    'parquet': 'application/vnd.apache.parquet',
+    'zip': 'application/zip'
+}
+
+_executor = None
+
+
+def _obter_executor(app):
+    # O limite de exportações simultâneas vale para o banco todo (ver _reivindicar)
+    global _executor
+    if _executor is None:
+        _executor = ThreadPoolExecutor(
+            max_workers=app.config.get('EXPORT_JOB_WORKERS', 1),
+            thread_name_prefix='export-job'
+        )
+    return _executor
+
+
+def diretorio_exportacoes(app):
+    """Diretório onde ficam os arquivos gerados até expirarem"""
+    diretorio = app.config.get('EXPORT_JOBS_DIR') or os.path.join(tempfile.gettempdir(), 'export_jobs')
+    os.makedirs(diretorio, exist_ok=True)
+    return diretorio
+
+
+def fila_cheia(app):
+    """Indica se já há exportações demais aguardando ou em andamento"""
+    em_andamento = ExportJob.query.filter(
+        ExportJob.status.in_([StatusJob.PENDENTE, StatusJob.PROCESSANDO])
+    ).count()
+    return em_andamento >= app.config.get('EXPORT_JOB_MAX_QUEUE', 10)
+
+
+def criar_job_exportacao(app, formato, tipo, data_inicio=None, data_fim=None, indicador_id=None):
+    """Registra a exportação e a coloca na fila"""
+    # Filtros inválidos falham já na requisição, não no worker
+    if data_inicio:
+        parse_data(data_inicio)
+    if data_fim:
+        parse_data(data_fim)
+    if indicador_id:
+        parse_uuid(indicador_id)
+
+    limpar_exportacoes_expiradas()
+
+    job = ExportJob(
+        id=uuid.uuid4(),
+        formato=formato,
+        tipo=tipo,
+        data_inicio=data_inicio,
+        data_fim=data_fim,
+        indicador_id=indicador_id
+    )
+    db.session.add(job)
+    db.session.commit()
+
+    _obter_executor(app).submit(executar_job_exportacao, app, job.id)
+    return job
+
+
+def _contar_linhas(job):
+    total = 0
+    if job.tipo in ['completo', 'indicacoes']:
+        total += query_indicacoes(job.data_inicio, job.data_fim, job.indicador_id).order_by(None).count()
+    if job.tipo in ['completo', 'indicadores']:
+        total += query_performance(job.data_inicio, job.data_fim).order_by(None).count()
+    return total
+
+
+def _reivindicar(app, job_id):
+    """Passa o job de pendente a processando, se houver vaga
+
+    O número de jobs em processamento é contado no banco, então o limite
+    EXPORT_JOB_WORKERS vale somando todos os processos. Jobs sem heartbeat
+    recente (worker morto) não ocupam vaga.
+    """
+    em_processamento = ExportJob.__table__.alias('em_processamento')
+    ocupados = select(func.count()).select_from(em_processamento).where(
+        em_processamento.c.status == StatusJob.PROCESSANDO,
+        em_processamento.c.updated_at >= limite_sem_heartbeat(app)
+    ).scalar_subquery()
+    reivindicado = db.session.execute(
+        update(ExportJob)
+        .where(
+            ExportJob.id == job_id,
+            ExportJob.status == StatusJob.PENDENTE,
+            ocupados < app.config.get('EXPORT_JOB_WORKERS', 1)
+        )
+        .values(status=StatusJob.PROCESSANDO, linhas_escritas=0, updated_at=datetime.utcnow())
+    ).rowcount
+    db.session.commit()
+    return bool(reivindicado)
+
+
+def _proximo_pendente():
+    return db.session.scalar(
+        select(ExportJob.id).where(ExportJob.status == StatusJob.PENDENTE)
+        .order_by(ExportJob.created_at).limit(1)
+    )
+
+
+def executar_job_exportacao(app, job_id):
+    """Gera o arquivo do job e, ao liberar a vaga, o das exportações pendentes (roda na thread do pool)"""
+    with app.app_context():
+        reenfileirar_exportacoes_abandonadas(app, submeter=False)
+        while job_id is not None:
+            if _reivindicar(app, job_id):
+                _gerar_arquivo(app, job_id)
+            elif db.session.get(ExportJob, job_id, populate_existing=True).status == StatusJob.PENDENTE:
+                return  # sem vaga: quem terminar uma exportação pega esta
+            # Pendentes de qualquer processo, na ordem de criação
+            job_id = _proximo_pendente()
+
+
+def _gerar_arquivo(app, job_id):
+    job = db.session.get(ExportJob, job_id)
+
+    def ao_progredir(linhas_escritas):
+        # Também serve de heartbeat: updated_at recente indica que o job está vivo
+        job.linhas_escritas = linhas_escritas
+        job.updated_at = datetime.utcnow()
+        db.session.commit()
+
+    caminho = None
+    try:
+        job.total_linhas = _contar_linhas(job)
+        db.session.commit()
+
+        # Nome temporário único: um job retomado nunca escreve no arquivo de outro processo
+        descritor, caminho = tempfile.mkstemp(prefix=f'{job.id}.', suffix='.tmp', dir=diretorio_exportacoes(app))
+        os.close(descritor)
+        if job.formato == 'parquet':
+            extensao = escrever_relatorio_parquet(caminho, job.tipo, job.data_inicio, job.data_fim,
+                                                  job.indicador_id, ao_progredir=ao_progredir)
+        else:
+            escrever_relatorio_excel(caminho, job.tipo, job.data_inicio, job.data_fim,
+                                     job.indicador_id, ao_progredir=ao_progredir)
+            extensao = 'xlsx'
+
+        caminho_final = os.path.join(diretorio_exportacoes(app), f'{job.id}.{extensao}')
+        os.replace(caminho, caminho_final)
+
+        job.caminho_arquivo = caminho_final
+        job.nome_arquivo = nome_arquivo_relatorio(job.tipo, job.data_inicio, job.data_fim, extensao)
+        job.mimetype = MIMETYPES[extensao]
+        job.expira_em = datetime.utcnow() + timedelta(seconds=app.config.get('EXPORT_JOB_TTL', 3600))
+        job.status = StatusJob.CONCLUIDO
+    except Exception as e:
+        db.session.rollback()
+        job.status = StatusJob.ERRO
+        job.erro = f'Erro na exportação: {str(e)}'
+        if caminho and os.path.exists(caminho):
+            os.unlink(caminho)
+    finally:
+        db.session.commit()
+
+
+def limpar_exportacoes_expiradas():
+    """Remove do disco os arquivos cujo prazo de download terminou"""
+    expirados = ExportJob.query.filter(
+        ExportJob.expira_em <= datetime.utcnow(),
+        ExportJob.caminho_arquivo.isnot(None)
+    ).all()
+    for job in expirados:
+        try:
+            os.unlink(job.caminho_arquivo)
+        except OSError:
+            pass
+        job.caminho_arquivo = None
+    db.session.commit()
+
+
+def reenfileirar_exportacoes_abandonadas(app, submeter=True):
+    """Devolve à fila os jobs em processamento sem heartbeat recente; retorna quantos
+
+    Os demais podem estar sendo gerados por outro processo. Ao contrário das
+    importações, gerar o arquivo de novo não tem efeito colateral. Roda também
+    ao agendar, reivindicar e consultar exportações: um worker reiniciado
+    antes de JOB_STALE_AFTER não encontra os próprios jobs na inicialização.
+    """
+    abandonados = ExportJob.status == StatusJob.PROCESSANDO, ExportJob.updated_at < limite_sem_heartbeat(app)
+    # Consulta antes do UPDATE: no caso comum nada muda e não há escrita no banco
+    if not db.session.scalar(select(func.count()).select_from(ExportJob).where(*abandonados)):
+        return 0
+
+    reenfileirados = db.session.execute(
+        update(ExportJob).where(*abandonados)
+        .values(status=StatusJob.PENDENTE, linhas_escritas=0, updated_at=datetime.utcnow())
+    ).rowcount
+    db.session.commit()
+
+    if reenfileirados and submeter:
+        _obter_executor(app).submit(executar_job_exportacao, app, _proximo_pendente())
+    return reenfileirados
+
+
+def retomar_exportacoes_pendentes(app):
+    """Chamado na inicialização: reenfileira exportações pendentes ou abandonadas"""
+    reenfileirar_exportacoes_abandonadas(app, submeter=False)
+    limpar_exportacoes_expiradas()
+
+    for job in ExportJob.query.filter_by(status=StatusJob.PENDENTE).all():
+        _obter_executor(app).submit(executar_job_exportacao, app, job.id)
@@ -0,0 +1,29 @@
+from datetime import datetime
+
+def format_currency(value_in_cents):
+    """Converte centavos para formato de moeda brasileira"""
+    if value_in_cents is None:
+        return "R$ 0,00"
+    return f"R$ {value_in_cents / 100:,.2f}".replace(',', 'X').replace('.', ',').replace('X', '.')
+
+def format_phone(phone):
+    """Formata telefone para exibição"""
+    if not phone:
+        return ""
+    # Remove +55 e formata como (XX) XXXXX-XXXX
+    clean_phone = phone.replace('+55', '')
+    if len(clean_phone) == 11:
+        return f"({clean_phone[:2]}) {clean_phone[2:7]}-{clean_phone[7:]}"
+    return phone
+
+def nome_arquivo_relatorio(tipo_relatorio, data_inicio, data_fim, extensao):
+    """Nome do arquivo baseado no tipo e filtros"""
+    filename = f"relatorio_{tipo_relatorio}"
+    if data_inicio and data_fim:
+        filename += f"_{data_inicio}_a_{data_fim}"
+    elif data_inicio:
+        filename += f"_desde_{data_inicio}"
+    elif data_fim:
+        filename += f"_ate_{data_fim}"
+    filename += f"_{datetime.now().strftime('%Y%m%d_%H%M%S')}.{extensao}"
+    return filename
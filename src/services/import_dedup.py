@@ -0,0 +1,84 @@
+import io
+import hashlib
+from datetime import datetime
+from sqlalchemy import select
+from src.models.user import db
+from src.models.import_fingerprint import ImportArquivo, ImportFingerprint
+
+# Máximo de parâmetros por cláusula IN (limite conservador do SQLite)
+TAMANHO_LOTE_CONSULTA = 500
+TAMANHO_BLOCO_LEITURA = 1024 * 1024
+
+
+def hash_arquivo(arquivo):
+    """SHA-256 de um arquivo seekable; o arquivo volta para o início"""
+    sha = hashlib.sha256()
+    arquivo.seek(0)
+    for bloco in iter(lambda: arquivo.read(TAMANHO_BLOCO_LEITURA), b''):
+        sha.update(bloco)
+    arquivo.seek(0)
+    return sha.hexdigest()
+
+
+class StreamComHash(io.RawIOBase):
+    """Envolve um stream não seekable calculando o SHA-256 do que é lido"""
+
+    def __init__(self, stream):
+        self.stream = stream
+        self.sha = hashlib.sha256()
+
+    def readable(self):
+        return True
+
+    def readinto(self, buffer):
+        dados = self.stream.read(len(buffer))
+        buffer[:len(dados)] = dados
+        self.sha.update(dados)
+        return len(dados)
+
+    def hexdigest(self):
+        return self.sha.hexdigest()
+
+
+def calcular_fingerprints(validas):
+    """Fingerprint por linha: telefone do indicador + telefone do indicado + data"""
+    chaves = (
+        validas['telefone_indicador'].astype(str)
+        + '|' + validas['telefone_indicado'].astype(str)
+        + '|' + validas['data_indicacao'].dt.strftime('%Y-%m-%d')
+    )
+    return chaves.map(lambda chave: hashlib.sha1(chave.encode('utf-8')).hexdigest())
+
+
+def fingerprints_existentes(fingerprints, session=None):
+    """Subconjunto dos fingerprints que já estão gravados"""
+    session = session or db.session
+    fingerprints = list(fingerprints)
+    existentes = set()
+
+    for inicio in range(0, len(fingerprints), TAMANHO_LOTE_CONSULTA):
+        lote = fingerprints[inicio:inicio + TAMANHO_LOTE_CONSULTA]
+        existentes.update(session.scalars(
+            select(ImportFingerprint.fingerprint).where(ImportFingerprint.fingerprint.in_(lote))
+        ))
+
+    return existentes
+
+
+def registrar_arquivo(hash_conteudo, nome_arquivo, relatorio):
+    """Grava (ou atualiza) o registro do arquivo importado; retorna se ele já era conhecido"""
+    arquivo = ImportArquivo.query.filter_by(hash=hash_conteudo).first()
+    ja_importado = arquivo is not None
+
+    if arquivo is None:
+        arquivo = ImportArquivo(hash=hash_conteudo, nome_arquivo=nome_arquivo, importacoes=0,
+                                linhas_criadas=0, linhas_ignoradas=0)
+        db.session.add(arquivo)
+
+    arquivo.importacoes += 1
+    arquivo.linhas_criadas += relatorio['linhas_criadas']
+    arquivo.linhas_ignoradas += relatorio['linhas_ignoradas']
+    arquivo.updated_at = datetime.utcnow()
+    db.session.commit()
+
+    return ja_importado
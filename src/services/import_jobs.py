@@ -0,0 +1,144 @@
+import os
+import json
+import uuid
+import tempfile
+from datetime import datetime, timedelta
+from concurrent.futures import ThreadPoolExecutor
+import pandas as pd
+from sqlalchemy import update, select, func
+from src.models.user import db
+from src.models.import_job import ImportJob, StatusJob
+from src.services.import_readers import lotes_excel, tamanho_lote_configurado
+from src.services.import_runner import importar_lotes
+from src.services.import_dedup import hash_arquivo
+
+_executor = None
+
+
+def _obter_executor(app):
+    global _executor
+    if _executor is None:
+        _executor = ThreadPoolExecutor(
+            max_workers=app.config.get('IMPORT_JOB_WORKERS', 2),
+            thread_name_prefix='import-job'
+        )
+    return _executor
+
+
+def diretorio_jobs(app):
+    """Diretório onde os arquivos enviados aguardam processamento"""
+    diretorio = app.config.get('IMPORT_JOBS_DIR') or os.path.join(tempfile.gettempdir(), 'import_jobs')
+    os.makedirs(diretorio, exist_ok=True)
+    return diretorio
+
+
+def limite_sem_heartbeat(app):
+    """Jobs em processamento sem atualização desde este instante são considerados abandonados"""
+    return datetime.utcnow() - timedelta(seconds=app.config.get('JOB_STALE_AFTER', 600))
+
+
+def criar_job(app, file, tamanho_chunk):
+    """Salva o arquivo enviado, registra o job e o coloca na fila"""
+    job_id = uuid.uuid4()
+    extensao = os.path.splitext(file.filename)[1].lower()
+    caminho = os.path.join(diretorio_jobs(app), f'{job_id}{extensao}')
+    file.save(caminho)
+
+    job = ImportJob(
+        id=job_id,
+        nome_arquivo=file.filename,
+        caminho_arquivo=caminho,
+        tamanho_chunk=tamanho_chunk
+    )
+    db.session.add(job)
+    db.session.commit()
+
+    _obter_executor(app).submit(executar_job, app, job_id)
+    return job
+
+
+def executar_job(app, job_id):
+    """Executa a importação de um job pendente (roda na thread do pool)"""
+    with app.app_context():
+        # Reivindica o job de forma atômica; outro worker pode já tê-lo pego
+        reivindicado = db.session.execute(
+            update(ImportJob)
+            .where(ImportJob.id == job_id, ImportJob.status == StatusJob.PENDENTE)
+            .values(status=StatusJob.PROCESSANDO, updated_at=datetime.utcnow())
+        ).rowcount
+        db.session.commit()
+        if not reivindicado:
+            return
+
+        job = db.session.get(ImportJob, job_id)
+
+        def ao_progredir(linhas_processadas, linhas_criadas, linhas_com_erro):
+            # Também serve de heartbeat: updated_at recente indica que o job está vivo
+            job.linhas_processadas = linhas_processadas
+            job.linhas_criadas = linhas_criadas
+            job.linhas_com_erro = linhas_com_erro
+            job.updated_at = datetime.utcnow()
+            db.session.commit()
+
+        try:
+            if job.caminho_arquivo.endswith('.xlsx'):
+                lotes = lotes_excel(job.caminho_arquivo, tamanho_lote_configurado(job.tamanho_chunk))
+            else:
+                lotes = [pd.read_excel(job.caminho_arquivo)]
+
+            with open(job.caminho_arquivo, 'rb') as arquivo:
+                hash_conteudo = hash_arquivo(arquivo)
+
+            relatorio = importar_lotes(lotes, job.tamanho_chunk, ao_progredir,
+                                       nome_arquivo=job.nome_arquivo, hash_arquivo=hash_conteudo)
+
+            job.linhas_processadas = relatorio['linhas_processadas']
+            job.linhas_criadas = relatorio['linhas_criadas']
+            job.linhas_com_erro = relatorio['linhas_com_erro']
+            job.relatorio = json.dumps(relatorio, ensure_ascii=False)
+            job.status = StatusJob.CONCLUIDO
+        except Exception as e:
+            db.session.rollback()
+            job.status = StatusJob.ERRO
+            job.erro = f'Erro na importação: {str(e)}'
+        finally:
+            db.session.commit()
+            try:
+                os.unlink(job.caminho_arquivo)
+            except OSError:
+                pass
+
+
+def encerrar_jobs_abandonados(app):
+    """Marca como erro os jobs em processamento sem heartbeat recente; retorna quantos
+
+    Não são retomados, pois parte dos chunks já pode ter sido gravada. Os jobs
+    com heartbeat recente podem estar sendo gravados por outro processo. Roda
+    também ao consultar o status: um worker reiniciado antes de JOB_STALE_AFTER
+    não encontra os próprios jobs na inicialização.
+    """
+    abandonados = ImportJob.status == StatusJob.PROCESSANDO, ImportJob.updated_at < limite_sem_heartbeat(app)
+    # Consulta antes do UPDATE: no caso comum nada muda e não há escrita no banco
+    if not db.session.scalar(select(func.count()).select_from(ImportJob).where(*abandonados)):
+        return 0
+
+    encerrados = db.session.execute(
+        update(ImportJob).where(*abandonados)
+        .values(status=StatusJob.ERRO, erro='Importação interrompida: o worker parou de responder',
+                updated_at=datetime.utcnow())
+    ).rowcount
+    db.session.commit()
+    return encerrados
+
+
+def retomar_jobs_pendentes(app):
+    """Chamado na inicialização: reenfileira jobs pendentes e encerra os interrompidos"""
+    encerrar_jobs_abandonados(app)
+
+    for job in ImportJob.query.filter_by(status=StatusJob.PENDENTE).all():
+        if os.path.exists(job.caminho_arquivo):
+            _obter_executor(app).submit(executar_job, app, job.id)
+        else:
+            job.status = StatusJob.ERRO
+            job.erro = 'Arquivo da importação não encontrado'
+    db.session.commit()
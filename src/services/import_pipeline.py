@@ -0,0 +1,195 @@
+import uuid
+import numpy as np
+import pandas as pd
+from src.models.indicacao import StatusRecompensa
+from src.services.telefone import normalizar_telefones
+
+# Colunas aceitas na planilha (nome principal, nome alternativo)
+COLUNAS = {
+    'data_indicacao': ('Data da Indicação', 'Data'),
+    'nome_indicador': ('Nome do Cliente Indicador', 'Indicador'),
+    'telefone_indicador': ('Telefone do Cliente Indicador', 'Telefone Indicador'),
+    'nome_indicado': ('Nome da Indicação', 'Indicado'),
+    'telefone_indicado': ('Telefone da Indicação', 'Telefone Indicado'),
+    'gerou_venda': ('Gerou Venda?', 'Venda'),
+    'faturamento': ('Faturamento Gerado', 'Faturamento'),
+}
+
+VALORES_VERDADEIROS = ['sim', 'yes', 'true', '1']
+
+# Coluna preenchida pelo leitor quando a linha não pôde ser lida (ex.: JSON inválido)
+COLUNA_ERRO_LEITURA = '_erro_leitura'
+
+
+def novo_relatorio(total_linhas):
+    """Cria o relatório de importação vazio"""
+    return {
+        'total_linhas': total_linhas,
+        'linhas_processadas': 0,
+        'linhas_criadas': 0,
+        'linhas_com_erro': 0,
+        'linhas_ignoradas': 0,
+        'erros': []
+    }
+
+
+class PlanilhaValidada:
+    """Resultado da validação coluna a coluna de uma planilha de indicações"""
+
+    def __init__(self, frame, erros, vazias):
+        self.frame = frame    # colunas normalizadas, mesmo índice da planilha
+        self.erros = erros    # mensagem de erro por linha (None quando válida)
+        self.vazias = vazias  # linhas totalmente vazias, ignoradas
+
+    @property
+    def mascara_erro(self):
+        return self.erros.notna()
+
+    @property
+    def linhas_processadas(self):
+        return int((~self.vazias).sum())
+
+    @property
+    def validas(self):
+        """Linhas prontas para gravação"""
+        return self.frame[~self.vazias & ~self.mascara_erro]
+
+
+def _coluna(df, principal, alternativa):
+    """Equivalente vetorizado de `row.get(principal) or row.get(alternativa)`"""
+    segunda = df[alternativa] if alternativa in df.columns else None
+    if principal not in df.columns:
+        return segunda if segunda is not None else pd.Series(None, index=df.index, dtype=object)
+
+    primeira = df[principal]
+    # NaN é "verdadeiro" para o `or`; só valores falsos (None, 0, '', False) caem na alternativa
+    return primeira.where(primeira.astype(object).astype(bool), segunda)
+
+
+def mapear_colunas(df):
+    """Resolve os nomes de coluna aceitos para os campos internos"""
+    return pd.DataFrame(
+        {campo: _coluna(df, *nomes) for campo, nomes in COLUNAS.items()},
+        index=df.index
+    )
+
+
+def converter_datas(serie):
+    """Converte datas da planilha; textos em dd/mm/aaaa ou aaaa-mm-dd"""
+    serie = serie.astype(object)
+    # Sem o acessor .str: ele falha quando a coluna só tem datas do Excel
+    eh_texto = serie.map(lambda valor: isinstance(valor, str)).astype(bool)
+
+    textos = serie.where(eh_texto)
+    datas = pd.to_datetime(textos, format='%d/%m/%Y', errors='coerce')
+    datas = datas.fillna(pd.to_datetime(textos, format='%Y-%m-%d', errors='coerce'))
+
+    # Valores já tipados pelo Excel (datetime/Timestamp) são mantidos
+    outros = pd.to_datetime(serie.where(~eh_texto & serie.notna()), errors='coerce')
+    return datas.where(eh_texto, outros)
+
+
+def converter_gerou_venda(serie):
+    """Converte a coluna "Gerou Venda?" em booleanos"""
+    textos = serie.astype(object).astype(str).str.lower()
+    return textos.isin(VALORES_VERDADEIROS) & serie.notna()
+
+
+def converter_faturamento(serie, gerou_venda):
+    """Converte valores em reais (ex.: "R$ 1.234,56") para centavos"""
+    textos = (
+        serie.astype(object).astype(str)
+        .str.replace('R$', '', regex=False)
+        .str.replace('.', '', regex=False)
+        .str.replace(',', '.', regex=False)
+        .str.replace(r'[^\d,.]', '', regex=True)
+    )
+    valores = pd.to_numeric(textos, errors='coerce')
+    centavos = np.trunc(valores * 100)
+    centavos = centavos.where(gerou_venda & serie.notna() & np.isfinite(centavos), 0)
+    return centavos.astype('int64')
+
+
+def normalizar_colunas_telefone(colunas, workers=1):
+    """Normaliza colunas de telefone em um único lote de valores distintos
+
+    Retorna, para cada coluna, (normalizados, mascara de invalidos) alinhados
+    ao índice das linhas.
+    """
+    distintos = pd.unique(pd.concat([coluna.dropna() for coluna in colunas]))
+    normalizados = normalizar_telefones(distintos, workers)
+
+    resultado = []
+    for coluna in colunas:
+        normalizada = coluna.map(normalizados).astype(object)
+        resultado.append((normalizada, normalizada.isna()))
+    return resultado
+
+
+def validar_planilha(df, workers_telefone=1):
+    """Valida e normaliza a planilha inteira com operações por coluna
+
+    `workers_telefone` > 1 habilita a normalização de telefones em paralelo.
+    """
+    vazias = df.isna().all(axis=1)
+    colunas = mapear_colunas(df)
+
+    datas = converter_datas(colunas['data_indicacao'])
+    (telefone_indicador, indicador_invalido), (telefone_indicado, indicado_invalido) = normalizar_colunas_telefone(
+        [colunas['telefone_indicador'], colunas['telefone_indicado']], workers_telefone
+    )
+    gerou_venda = converter_gerou_venda(colunas['gerou_venda'])
+    erro_leitura = df[COLUNA_ERRO_LEITURA] if COLUNA_ERRO_LEITURA in df.columns \
+        else pd.Series(None, index=df.index, dtype=object)
+
+    faltando = (
+        colunas['data_indicacao'].isna()
+        | colunas['nome_indicador'].isna()
+        | colunas['nome_indicado'].isna()
+    )
+
+    # Mesma precedência da validação linha a linha: obrigatórios, data, telefones
+    # (linhas ilegíveis não têm campos, então o erro de leitura vem antes)
+    erros = pd.Series(
+        np.select(
+            [vazias, erro_leitura.notna(), faltando, datas.isna(), indicador_invalido | indicado_invalido],
+            [None, erro_leitura.astype(object), 'Dados obrigatórios faltando', 'Formato de data inválido',
+             'Telefone inválido'],
+            default=None
+        ),
+        index=df.index,
+        dtype=object
+    )
+
+    frame = pd.DataFrame({
+        'data_indicacao': datas,
+        'nome_indicador': colunas['nome_indicador'],
+        'telefone_indicador': telefone_indicador,
+        'nome_indicado': colunas['nome_indicado'],
+        'telefone_indicado': telefone_indicado,
+        'gerou_venda': gerou_venda,
+        'faturamento_gerado': converter_faturamento(colunas['faturamento'], gerou_venda),
+    }, index=df.index)
+    frame['status_recompensa'] = np.where(
+        gerou_venda, StatusRecompensa.EM_PROCESSAMENTO, StatusRecompensa.NAO
+    )
+
+    return PlanilhaValidada(frame, erros, vazias)
+
+
+def montar_registros(validas, resolver):
+    """Converte as linhas válidas em parâmetros de INSERT da tabela de indicações"""
+    registros = pd.DataFrame({
+        'id': [uuid.uuid4() for _ in range(len(validas))],
+        'data_indicacao': [data.to_pydatetime() for data in validas['data_indicacao']],
+        'nome_indicado': validas['nome_indicado'].to_numpy(),
+        'telefone_indicado': validas['telefone_indicado'].to_numpy(),
+        'gerou_venda': validas['gerou_venda'].to_numpy(),
+        'faturamento_gerado': validas['faturamento_gerado'].to_numpy(),
+        'status_recompensa': validas['status_recompensa'].to_numpy(),
+        'indicador_id': [
+            resolver.obter_id(nome, telefone)
+            for nome, telefone in zip(validas['nome_indicador'], validas['telefone_indicador'])
+        ],
+    })
+    return registros.to_dict('records')
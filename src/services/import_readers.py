@@ -0,0 +1,114 @@
+import io
+import json
+import pandas as pd
+import openpyxl
+from flask import current_app
+from src.services.import_pipeline import COLUNA_ERRO_LEITURA
+
+TAMANHO_LOTE_LEITURA = 20000
+
+
+def tamanho_lote_configurado(tamanho_chunk):
+    """Linhas lidas e validadas por vez (IMPORT_READ_BATCH), nunca menos que um chunk
+
+    O lote de leitura é maior que o chunk de gravação para que a normalização
+    de telefones veja valores distintos suficientes para usar o pool de
+    processos; a gravação continua em chunks de `tamanho_chunk`.
+    """
+    return max(current_app.config.get('IMPORT_READ_BATCH', TAMANHO_LOTE_LEITURA), tamanho_chunk)
+
+
+def _lotes(cabecalho, linhas, tamanho_lote):
+    """Agrupa linhas em DataFrames de até `tamanho_lote` linhas, com índice contínuo
+
+    Sem cabeçalho, as linhas devem ser dicts e as colunas vêm das chaves.
+    """
+    inicio = 0
+    lote = []
+    for linha in linhas:
+        lote.append(linha)
+        if len(lote) >= tamanho_lote:
+            yield pd.DataFrame(lote, columns=cabecalho, index=range(inicio, inicio + len(lote)), dtype=object)
+            inicio += len(lote)
+            lote = []
+    if lote:
+        yield pd.DataFrame(lote, columns=cabecalho, index=range(inicio, inicio + len(lote)), dtype=object)
+
+
+def _linhas_excel(linhas, largura):
+    """Ajusta as linhas à largura do cabeçalho e descarta linhas vazias no fim da aba"""
+    vazias = 0
+    for linha in linhas:
+        linha = tuple(linha[:largura]) + (None,) * (largura - len(linha))
+        if all(valor is None for valor in linha):
+            vazias += 1
+            continue
+        # Linhas vazias no meio da planilha continuam contando, como no pandas
+        for _ in range(vazias):
+            yield (None,) * largura
+        vazias = 0
+        yield linha
+
+
+def lotes_excel(arquivo, tamanho_lote):
+    """Lê uma planilha .xlsx em modo read_only, em lotes de tamanho fixo
+
+    Apenas a linha corrente e o lote atual ficam em memória, independente do
+    tamanho do arquivo.
+    """
+    wb = openpyxl.load_workbook(arquivo, read_only=True, data_only=True)
+    try:
+        linhas = wb.active.iter_rows(values_only=True)
+        cabecalho = next(linhas, None)
+        if cabecalho is None:
+            return
+
+        cabecalho = [nome if nome is not None else f'Unnamed: {i}' for i, nome in enumerate(cabecalho)]
+        yield from _lotes(cabecalho, _linhas_excel(linhas, len(cabecalho)), tamanho_lote)
+    finally:
+        wb.close()
+
+
+def lotes_csv(stream, tamanho_lote, sep=',', encoding='utf-8'):
+    """Lê um CSV de forma incremental, em lotes de `tamanho_lote` linhas
+
+    Todas as colunas são lidas como texto, para não perder zeros e formatação
+    de telefones; a conversão fica a cargo da validação da importação.
+    """
+    leitor = pd.read_csv(
+        stream,
+        sep=sep,
+        encoding=encoding,
+        dtype=str,
+        skip_blank_lines=False,
+        chunksize=tamanho_lote
+    )
+    with leitor:
+        yield from leitor
+
+
+def lotes_ndjson(stream, tamanho_lote, encoding='utf-8'):
+    """Lê NDJSON (um objeto JSON por linha) de forma incremental
+
+    Linhas ilegíveis viram erro da própria linha no relatório, como as linhas
+    inválidas de Excel e CSV: os lotes anteriores já podem ter sido gravados.
+    """
+    texto = io.TextIOWrapper(stream, encoding=encoding)
+
+    def registros():
+        for linha in texto:
+            linha = linha.strip()
+            if not linha:
+                yield {}
+                continue
+            try:
+                registro = json.loads(linha)
+            except ValueError:
+                yield {COLUNA_ERRO_LEITURA: 'JSON inválido'}
+                continue
+            if not isinstance(registro, dict):
+                yield {COLUNA_ERRO_LEITURA: 'Esperado um objeto JSON'}
+                continue
+            yield registro
+
+    yield from _lotes(None, registros(), tamanho_lote)
@@ -0,0 +1,105 @@
+from flask import current_app
+from src.models.user import db
+from src.services.import_pipeline import validar_planilha, novo_relatorio, montar_registros
+from src.services.bulk_writer import IndicacaoBulkWriter
+from src.services.indicador_resolver import IndicadorResolver
+from src.services.import_dedup import calcular_fingerprints, fingerprints_existentes, registrar_arquivo
+
+
+def importar_lotes(lotes, tamanho_chunk, ao_progredir=None, nome_arquivo=None, hash_arquivo=None):
+    """Valida e grava uma sequência de DataFrames; retorna o relatório de importação
+
+    Cada lote mantém o índice original das linhas na planilha, para que os erros
+    apontem a linha certa. Só um lote fica em memória por vez. `ao_progredir`,
+    se informado, recebe (linhas_processadas, linhas_criadas, linhas_com_erro)
+    depois da validação de cada lote e de cada chunk gravado; um lote grande
+    (ex.: .xls lido de uma vez) também informa progresso durante a gravação.
+
+    Linhas cujo fingerprint já foi importado (ou que se repetem no arquivo)
+    são ignoradas. `hash_arquivo` pode ser o hash do conteúdo ou uma função que
+    o calcula ao fim da leitura, para arquivos lidos em streaming.
+    """
+    relatorio = novo_relatorio(0)
+    erros = {}
+    resolver = IndicadorResolver()
+
+    def progredir():
+        if ao_progredir:
+            ao_progredir(
+                relatorio['linhas_processadas'],
+                writer.linhas_criadas,
+                len(erros) + len(writer.falhas)
+            )
+
+    writer = IndicacaoBulkWriter(tamanho_chunk, ao_gravar=progredir)
+    workers_telefone = current_app.config.get('IMPORT_PHONE_WORKERS', 1)
+
+    for df in lotes:
+        relatorio['total_linhas'] += len(df)
+
+        planilha = validar_planilha(df, workers_telefone)
+        relatorio['linhas_processadas'] += planilha.linhas_processadas
+        erros.update(planilha.erros.dropna().items())
+        progredir()
+
+        # Ignorar linhas já importadas e repetidas dentro do arquivo
+        validas = planilha.validas
+        fingerprints = calcular_fingerprints(validas)
+        repetidas = fingerprints.duplicated() | fingerprints.isin(fingerprints_existentes(fingerprints.unique()))
+        relatorio['linhas_ignoradas'] += int(repetidas.sum())
+        validas, fingerprints = validas[~repetidas], fingerprints[~repetidas]
+
+        # Encontrar ou criar os indicadores do lote de uma vez
+        resolver.resolver(zip(validas['nome_indicador'], validas['telefone_indicador']))
+        db.session.commit()  # indicadores gravados antes dos chunks de indicações
+
+        writer.adicionar_varios(validas.index, montar_registros(validas, resolver), fingerprints)
+        # Lote gravado antes do próximo, para que os fingerprints dele já sejam vistos
+        writer.descarregar()
+
+    relatorio['chunks'] = writer.finalizar()
+    relatorio['linhas_criadas'] = writer.linhas_criadas
+
+    erros.update(writer.falhas)
+    relatorio['erros'] = [f'Linha {linha + 1}: {mensagem}' for linha, mensagem in sorted(erros.items())]
+    relatorio['linhas_com_erro'] = len(relatorio['erros'])
+
+    if hash_arquivo is not None:
+        hash_conteudo = hash_arquivo() if callable(hash_arquivo) else hash_arquivo
+        relatorio['arquivo_hash'] = hash_conteudo
+        relatorio['arquivo_ja_importado'] = registrar_arquivo(hash_conteudo, nome_arquivo, relatorio)
+
+    return relatorio
+
+
+def validar_lotes(lotes):
+    """Simulação (dry run): mesma validação e mesmo relatório, sem acessar o banco
+
+    `linhas_criadas` conta as linhas que seriam gravadas; repetições dentro do
+    próprio arquivo entram em `linhas_ignoradas`. Fingerprints de importações
+    anteriores não são consultados.
+    """
+    relatorio = novo_relatorio(0)
+    relatorio['dry_run'] = True
+    erros = {}
+    vistos = set()
+    workers_telefone = current_app.config.get('IMPORT_PHONE_WORKERS', 1)
+
+    for df in lotes:
+        relatorio['total_linhas'] += len(df)
+
+        planilha = validar_planilha(df, workers_telefone)
+        relatorio['linhas_processadas'] += planilha.linhas_processadas
+        erros.update(planilha.erros.dropna().items())
+
+        fingerprints = calcular_fingerprints(planilha.validas)
+        repetidas = fingerprints.duplicated() | fingerprints.isin(vistos)
+        vistos.update(fingerprints)
+
+        relatorio['linhas_ignoradas'] += int(repetidas.sum())
+        relatorio['linhas_criadas'] += int((~repetidas).sum())
+
+    relatorio['erros'] = [f'Linha {linha + 1}: {mensagem}' for linha, mensagem in sorted(erros.items())]
+    relatorio['linhas_com_erro'] = len(relatorio['erros'])
+
+    return relatorio
@@ -0,0 +1,73 @@
+import uuid
+from datetime import datetime
+from sqlalchemy import insert, select
+from src.models.user import db
+from src.models.indicador import Indicador
+from src.models.telefone_busca import indexar_telefones, INDICADOR
+from src.services.busca import indexar_indicadores
+
+# Máximo de parâmetros por cláusula IN (limite conservador do SQLite)
+TAMANHO_LOTE_CONSULTA = 500
+
+
+def chave_indicador(nome, telefone):
+    """Chave normalizada de identidade do indicador"""
+    return (str(nome).strip(), telefone)
+
+
+class IndicadorResolver:
+    """Mapa de identidade (nome, telefone) -> id para encontrar ou criar indicadores em lote"""
+
+    def __init__(self, session=None):
+        self.session = session or db.session
+        self.ids = {}
+
+    def carregar(self, pares):
+        """Carrega do banco os indicadores dos pares ainda não conhecidos"""
+        faltando = {chave_indicador(*par) for par in pares} - self.ids.keys()
+        telefones = sorted({telefone for _, telefone in faltando})
+
+        for inicio in range(0, len(telefones), TAMANHO_LOTE_CONSULTA):
+            lote = telefones[inicio:inicio + TAMANHO_LOTE_CONSULTA]
+            linhas = self.session.execute(
+                select(Indicador.id, Indicador.nome, Indicador.telefone)
+                .where(Indicador.telefone.in_(lote))
+            )
+            for id_, nome, telefone in linhas:
+                self.ids.setdefault(chave_indicador(nome, telefone), id_)
+
+        return faltando - self.ids.keys()
+
+    def resolver(self, pares, detalhes=None):
+        """Encontra ou cria os indicadores; retorna {chave: indicador_id}
+
+        `detalhes` pode trazer campos extras (email, empresa) por chave para os
+        indicadores criados. Não faz commit: a inserção entra na transação atual.
+        """
+        detalhes = detalhes or {}
+        novos = []
+        agora = datetime.utcnow()
+
+        for nome, telefone in sorted(self.carregar(pares)):
+            id_ = uuid.uuid4()
+            novos.append({
+                'id': id_,
+                'nome': nome,
+                'telefone': telefone,
+                'email': None,
+                'empresa': None,
+                'created_at': agora,
+                'updated_at': agora,
+                **detalhes.get((nome, telefone), {})
+            })
+            self.ids[(nome, telefone)] = id_
+
+        if novos:
+            self.session.execute(insert(Indicador), novos)
+            indexar_indicadores(self.session.connection(), [(novo['id'], novo['nome']) for novo in novos])
+            indexar_telefones(self.session.connection(), INDICADOR, [(novo['id'], novo['telefone']) for novo in novos])
+
+        return self.ids
+
+    def obter_id(self, nome, telefone):
+        return self.ids[chave_indicador(nome, telefone)]
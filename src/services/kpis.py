@@ -0,0 +1,40 @@
+from sqlalchemy import select, func, distinct
+from src.models.user import db
+from src.models.indicador import Indicador
+from src.models.indicacao import StatusRecompensa
+from src.models.rollup_diario import RollupDiario
+from src.services.relatorio_queries import parse_uuid
+from src.services.rollup import filtros_rollup
+
+
+def calcular_kpis(inicio=None, fim=None, indicador_id=None, status_recompensa=None,
+                  incluir_indicadores_cadastrados=False):
+    """Todos os KPIs do período em uma única consulta sobre o rollup diário
+
+    `total_indicadores` conta os indicadores distintos com indicações no
+    filtro; `total_indicadores_cadastrados` (opcional, subconsulta escalar na
+    mesma instrução) conta todos os indicadores da base. As datas são
+    consideradas por dia inteiro.
+    """
+    colunas = [
+        func.coalesce(func.sum(RollupDiario.total_indicacoes), 0).label('total_indicacoes'),
+        func.count(distinct(RollupDiario.indicador_id)).label('total_indicadores'),
+        func.coalesce(func.sum(RollupDiario.total_vendas), 0).label('total_vendas'),
+        func.coalesce(func.sum(RollupDiario.faturamento_total), 0).label('faturamento_total')
+    ]
+    if incluir_indicadores_cadastrados:
+        colunas.append(
+            select(func.count(Indicador.id)).scalar_subquery().label('total_indicadores_cadastrados')
+        )
+
+    filtros = filtros_rollup(
+        inicio, fim,
+        parse_uuid(indicador_id) if indicador_id else None,
+        StatusRecompensa(status_recompensa) if status_recompensa else None
+    )
+    linha = db.session.execute(select(*colunas).where(*filtros)).one()
+
+    kpis = dict(linha._mapping)
+    total = kpis['total_indicacoes']
+    kpis['taxa_conversao'] = (kpis['total_vendas'] / total * 100) if total > 0 else 0
+    return kpis
@@ -0,0 +1,63 @@
+from datetime import datetime
+from sqlalchemy import inspect, select
+from sqlalchemy.exc import DBAPIError
+from src.models.user import db
+from src.models.migracao import Migracao
+
+
+def _criar_indices_declarados(connection):
+    """Índices declarados nos modelos que ainda não existem no banco
+
+    db.create_all() só cria índices junto com tabelas novas; em tabelas que já
+    existiam eles precisam ser criados aqui.
+    """
+    inspetor = inspect(connection)
+    for tabela in db.metadata.sorted_tables:
+        if not inspetor.has_table(tabela.name):
+            continue
+        existentes = {indice['name'] for indice in inspetor.get_indexes(tabela.name)}
+        for indice in tabela.indexes:
+            if indice.name not in existentes:
+                indice.create(connection)
+
+
+# Em ordem de aplicação; cada migração roda uma única vez, na própria transação.
+# Novas migrações entram no fim da lista com um nome novo.
+MIGRACOES = [
+    ('0001_indices_consultas', _criar_indices_declarados),
+]
+
+
+def migracoes_pendentes(connection):
+    aplicadas = set(connection.scalars(select(Migracao.nome)))
+    return [(nome, funcao) for nome, funcao in MIGRACOES if nome not in aplicadas]
+
+
+def _aplicada(engine, nome):
+    with engine.connect() as connection:
+        return connection.scalar(select(Migracao.nome).where(Migracao.nome == nome)) is not None
+
+
+def aplicar_migracoes(engine=None):
+    """Aplica as migrações pendentes (chamado na inicialização e por src/migrate.py)
+
+    Retorna os nomes aplicadas nesta chamada.
+    """
+    engine = engine or db.engine
+    Migracao.__table__.create(engine, checkfirst=True)
+    with engine.connect() as connection:
+        pendentes = migracoes_pendentes(connection)
+
+    aplicadas = []
+    for nome, funcao in pendentes:
+        try:
+            with engine.begin() as connection:
+                funcao(connection)
+                connection.execute(Migracao.__table__.insert().values(nome=nome, aplicada_em=datetime.utcnow()))
+        except DBAPIError:
+            # Outro worker pode ter aplicado a mesma migração ao mesmo tempo
+            if _aplicada(engine, nome):
+                continue
+            raise
+        aplicadas.append(nome)
+    return aplicadas
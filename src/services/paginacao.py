@@ -0,0 +1,59 @@
+import json
+import base64
+import binascii
+from sqlalchemy import and_, or_
+
+
+class CursorInvalido(ValueError):
+    pass
+
+
+def total_solicitado(args):
+    """No modo cursor o COUNT só é feito quando pedido com ?with_total=1"""
+    return args.get('with_total') in ('1', 'true')
+
+
+def codificar_cursor(valores):
+    """Cursor opaco (base64 de JSON) com os valores de ordenação da última linha"""
+    texto = json.dumps([str(valor) if not isinstance(valor, str) else valor for valor in valores])
+    return base64.urlsafe_b64encode(texto.encode('utf-8')).decode('ascii').rstrip('=')
+
+
+def decodificar_cursor(cursor, conversores):
+    try:
+        texto = base64.urlsafe_b64decode(cursor + '=' * (-len(cursor) % 4)).decode('utf-8')
+        valores = json.loads(texto)
+        if not isinstance(valores, list) or len(valores) != len(conversores):
+            raise CursorInvalido('Cursor inválido')
+        return [converter(valor) for converter, valor in zip(conversores, valores)]
+    except (binascii.Error, UnicodeDecodeError, json.JSONDecodeError, TypeError, ValueError):
+        raise CursorInvalido('Cursor inválido')
+
+
+def _depois_de(colunas, valores, decrescente):
+    """(c1, c2, ...) depois de (v1, v2, ...) na ordenação, sem depender de row values"""
+    coluna, valor = colunas[0], valores[0]
+    depois = coluna < valor if decrescente else coluna > valor
+    if len(colunas) == 1:
+        return depois
+    return or_(depois, and_(coluna == valor, _depois_de(colunas[1:], valores[1:], decrescente)))
+
+
+def pagina_por_cursor(query, colunas, conversores, cursor, por_pagina, decrescente=False):
+    """Página por keyset: WHERE (ordenação) > cursor ORDER BY ... LIMIT n + 1
+
+    O custo por página é constante, sem OFFSET nem COUNT. A ordenação do
+    keyset substitui qualquer outra da query (ex.: relevância da busca).
+    Retorna (itens, próximo cursor ou None, tamanho de página aplicado).
+    """
+    if cursor:
+        query = query.filter(_depois_de(colunas, decodificar_cursor(cursor, conversores), decrescente))
+
+    por_pagina = max(por_pagina, 1)  # per_page=0 ou negativo: uma linha por página
+    ordem = [coluna.desc() if decrescente else coluna.asc() for coluna in colunas]
+    itens = query.order_by(None).order_by(*ordem).limit(por_pagina + 1).all()
+
+    if len(itens) <= por_pagina:
+        return itens, None, por_pagina
+    itens = itens[:por_pagina]
+    return itens, codificar_cursor([getattr(itens[-1], coluna.key) for coluna in colunas]), por_pagina
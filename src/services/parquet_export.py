@@ -0,0 +1,151 @@
+import io
+import zipfile
+import pyarrow as pa
+import pyarrow.parquet as pq
+from src.models.indicacao import StatusRecompensa
+from src.services.relatorio_queries import query_indicacoes_completas, query_performance
+
+TAMANHO_LOTE = 10000  # linhas por row group
+COMPRESSAO = 'zstd'
+
+_STATUS = pa.dictionary(pa.int8(), pa.string())
+
+SCHEMA_INDICACOES = pa.schema([
+    ('id', pa.string()),
+    ('data_indicacao', pa.date32()),
+    ('nome_indicado', pa.string()),
+    ('telefone_indicado', pa.string()),
+    ('gerou_venda', pa.bool_()),
+    ('faturamento_centavos', pa.int64()),
+    ('status_recompensa', _STATUS),
+    ('observacoes', pa.string()),
+    ('indicador_id', pa.string()),
+    ('indicador_nome', pa.string()),
+    ('indicador_telefone', pa.string()),
+    ('indicador_email', pa.string()),
+    ('indicador_empresa', pa.string()),
+    ('created_at', pa.timestamp('us')),
+    ('updated_at', pa.timestamp('us'))
+])
+
+SCHEMA_PERFORMANCE = pa.schema([
+    ('indicador_id', pa.string()),
+    ('nome', pa.string()),
+    ('empresa', pa.string()),
+    ('telefone', pa.string()),
+    ('email', pa.string()),
+    ('total_indicacoes', pa.int64()),
+    ('total_vendas', pa.int64()),
+    ('taxa_conversao', pa.float64()),
+    ('faturamento_centavos', pa.int64())
+])
+
+# Dicionário fixo: o código de cada status é o mesmo em todos os arquivos
+_VALORES_STATUS = pa.array([status.value for status in StatusRecompensa])
+_CODIGOS_STATUS = {status: codigo for codigo, status in enumerate(StatusRecompensa)}
+
+
+def _colunas_indicacoes(linhas):
+    return {
+        'id': [str(linha.id) for linha in linhas],
+        'data_indicacao': [linha.data_indicacao.date() for linha in linhas],
+        'nome_indicado': [linha.nome_indicado for linha in linhas],
+        'telefone_indicado': [linha.telefone_indicado for linha in linhas],
+        'gerou_venda': [bool(linha.gerou_venda) for linha in linhas],
+        'faturamento_centavos': [linha.faturamento_gerado or 0 for linha in linhas],
+        'status_recompensa': pa.DictionaryArray.from_arrays(
+            pa.array([_CODIGOS_STATUS.get(linha.status_recompensa) for linha in linhas], type=pa.int8()),
+            _VALORES_STATUS
+        ),
+        'observacoes': [linha.observacoes for linha in linhas],
+        'indicador_id': [str(linha.indicador_id) for linha in linhas],
+        'indicador_nome': [linha.indicador_nome for linha in linhas],
+        'indicador_telefone': [linha.indicador_telefone for linha in linhas],
+        'indicador_email': [linha.indicador_email for linha in linhas],
+        'indicador_empresa': [linha.indicador_empresa for linha in linhas],
+        'created_at': [linha.created_at for linha in linhas],
+        'updated_at': [linha.updated_at for linha in linhas]
+    }
+
+
+def _colunas_performance(linhas):
+    colunas = {nome: [] for nome in SCHEMA_PERFORMANCE.names}
+    for linha in linhas:
+        total_indicacoes = linha.total_indicacoes or 0
+        total_vendas = linha.total_vendas or 0
+        colunas['indicador_id'].append(str(linha.id))
+        colunas['nome'].append(linha.nome)
+        colunas['empresa'].append(linha.empresa)
+        colunas['telefone'].append(linha.telefone)
+        colunas['email'].append(linha.email)
+        colunas['total_indicacoes'].append(total_indicacoes)
+        colunas['total_vendas'].append(total_vendas)
+        colunas['taxa_conversao'].append(
+            total_vendas / total_indicacoes * 100 if total_indicacoes > 0 else 0.0
+        )
+        colunas['faturamento_centavos'].append(linha.faturamento_total or 0)
+    return colunas
+
+
+def _escrever(destino, schema, query, montar_colunas, tamanho_lote, ao_gravar_lote=None):
+    """Grava a consulta em Parquet, um row group por lote de linhas"""
+    with pq.ParquetWriter(destino, schema, compression=COMPRESSAO) as writer:
+        lote = []
+        for linha in query.yield_per(tamanho_lote):
+            lote.append(linha)
+            if len(lote) >= tamanho_lote:
+                writer.write_table(pa.table(montar_colunas(lote), schema=schema))
+                if ao_gravar_lote:
+                    ao_gravar_lote(len(lote))
+                lote = []
+        if lote:
+            writer.write_table(pa.table(montar_colunas(lote), schema=schema))
+            if ao_gravar_lote:
+                ao_gravar_lote(len(lote))
+
+
+def escrever_indicacoes_parquet(destino, data_inicio=None, data_fim=None, indicador_id=None,
+                                tamanho_lote=TAMANHO_LOTE, ao_gravar_lote=None):
+    query = query_indicacoes_completas(data_inicio, data_fim, indicador_id)
+    _escrever(destino, SCHEMA_INDICACOES, query, _colunas_indicacoes, tamanho_lote, ao_gravar_lote)
+
+
+def escrever_performance_parquet(destino, data_inicio=None, data_fim=None, tamanho_lote=TAMANHO_LOTE,
+                                 ao_gravar_lote=None):
+    query = query_performance(data_inicio, data_fim)
+    _escrever(destino, SCHEMA_PERFORMANCE, query, _colunas_performance, tamanho_lote, ao_gravar_lote)
+
+
+def escrever_relatorio_parquet(destino, tipo_relatorio='completo', data_inicio=None, data_fim=None,
+                               indicador_id=None, ao_progredir=None):
+    """Grava o relatório em Parquet; `completo` gera um zip com os dois arquivos
+
+    Retorna a extensão do arquivo gerado ('parquet' ou 'zip').
+    `ao_progredir(linhas_escritas)` é chamado a cada row group, se informado.
+    """
+    linhas_escritas = 0
+
+    def ao_gravar_lote(linhas):
+        nonlocal linhas_escritas
+        linhas_escritas += linhas
+        if ao_progredir:
+            ao_progredir(linhas_escritas)
+
+    if tipo_relatorio == 'indicacoes':
+        escrever_indicacoes_parquet(destino, data_inicio, data_fim, indicador_id,
+                                    ao_gravar_lote=ao_gravar_lote)
+        return 'parquet'
+    if tipo_relatorio == 'indicadores':
+        escrever_performance_parquet(destino, data_inicio, data_fim, ao_gravar_lote=ao_gravar_lote)
+        return 'parquet'
+
+    # Os arquivos Parquet já são comprimidos; o zip apenas os agrupa
+    with zipfile.ZipFile(destino, 'w', compression=zipfile.ZIP_STORED) as arquivo_zip:
+        for nome, escrever, argumentos in (
+            ('indicacoes.parquet', escrever_indicacoes_parquet, (data_inicio, data_fim, indicador_id)),
+            ('performance_indicadores.parquet', escrever_performance_parquet, (data_inicio, data_fim))
+        ):
+            buffer = io.BytesIO()
+            escrever(buffer, *argumentos, ao_gravar_lote=ao_gravar_lote)
+            arquivo_zip.writestr(nome, buffer.getvalue())
+    return 'zip'
@@ -0,0 +1,92 @@
+import re
+import json
+import uuid
+from datetime import datetime, date
+from sqlalchemy import select, text
+from src.models.user import db
+from src.models.indicador import Indicador
+from src.models.indicacao import Indicacao, StatusRecompensa
+from src.models.rollup_diario import RollupDiario
+from src.models.telefone_busca import INDICACAO
+from src.services.relatorio_queries import query_indicacoes_completas
+from src.services.busca_telefone import registros_por_telefone
+
+# Linha do EXPLAIN QUERY PLAN do SQLite que lê a tabela inteira sem índice
+_VARREDURA_SQLITE = re.compile(r'^SCAN (\w+)$')
+
+
+def consultas_principais():
+    """Consultas quentes da API, no formato usado pelas rotas e serviços"""
+    inicio, fim = datetime(2024, 1, 1), datetime(2024, 12, 31)
+    indicador_id = uuid.UUID(int=1)
+    lista = select(Indicacao.id).join(Indicador)
+    recentes = (Indicacao.data_indicacao.desc(), Indicacao.id.desc())
+    return [
+        ('indicacoes_recentes', lista.order_by(*recentes).limit(11)),
+        ('indicacoes_periodo', lista.where(
+            Indicacao.data_indicacao >= inicio, Indicacao.data_indicacao <= fim
+        ).order_by(*recentes).limit(11)),
+        ('indicacoes_por_indicador', lista.where(
+            Indicacao.indicador_id == indicador_id
+        ).order_by(*recentes).limit(11)),
+        ('indicacoes_por_status', select(Indicacao.id).where(
+            Indicacao.status_recompensa == StatusRecompensa.EM_PROCESSAMENTO,
+            Indicacao.data_indicacao >= inicio
+        )),
+        ('indicacoes_com_venda', select(Indicacao.id).where(
+            Indicacao.gerou_venda == True, Indicacao.data_indicacao >= inicio
+        )),
+        ('exportacao_periodo', query_indicacoes_completas('2024-01-01', '2024-12-31').statement),
+        ('indicadores_por_nome', select(Indicador.id).where(
+            Indicador.nome > 'M'
+        ).order_by(Indicador.nome, Indicador.id).limit(11)),
+        ('indicadores_por_telefone', select(Indicador.id, Indicador.nome, Indicador.telefone).where(
+            Indicador.telefone.in_(['+5511987654321', '+5511876543210'])
+        )),
+        ('rollup_periodo', select(RollupDiario.indicador_id).where(
+            RollupDiario.dia >= date(2024, 1, 1), RollupDiario.dia <= date(2024, 12, 31)
+        )),
+        ('telefone_parcial', registros_por_telefone(INDICACAO, '98765')),
+    ]
+
+
+def _sql(statement, dialect):
+    return str(statement.compile(dialect=dialect, compile_kwargs={'literal_binds': True}))
+
+
+def _varreduras_sqlite(connection, sql):
+    plano = [linha[-1] for linha in connection.execute(text('EXPLAIN QUERY PLAN ' + sql))]
+    varreduras = [m.group(1) for m in map(_VARREDURA_SQLITE.match, plano) if m]
+    return plano, varreduras
+
+
+def _varreduras_postgres(connection, sql):
+    # Sem seq scan "barato" à disposição, o planejador só o escolhe se não há índice útil
+    connection.execute(text('SET LOCAL enable_seqscan = off'))
+    plano = connection.execute(text('EXPLAIN (FORMAT JSON) ' + sql)).scalar()
+    if isinstance(plano, str):
+        plano = json.loads(plano)
+    varreduras, pendentes = [], [plano[0]['Plan']]
+    while pendentes:
+        no = pendentes.pop()
+        if no.get('Node Type') == 'Seq Scan':
+            varreduras.append(no.get('Relation Name'))
+        pendentes.extend(no.get('Plans', []))
+    return [json.dumps(plano)], varreduras
+
+
+def verificar_planos(engine=None):
+    """EXPLAIN de cada consulta principal; lista as tabelas lidas por inteiro
+
+    Retorna [{'consulta', 'plano', 'varreduras'}]; uma consulta com
+    `varreduras` não vazio não encontrou índice para os filtros/ordenação.
+    """
+    engine = engine or db.engine
+    explicar = _varreduras_sqlite if engine.dialect.name == 'sqlite' else _varreduras_postgres
+    resultados = []
+    with engine.connect() as connection:
+        for nome, statement in consultas_principais():
+            with connection.begin():
+                plano, varreduras = explicar(connection, _sql(statement, engine.dialect))
+            resultados.append({'consulta': nome, 'plano': plano, 'varreduras': varreduras})
+    return resultados
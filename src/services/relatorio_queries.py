@@ -0,0 +1,126 @@
+import uuid
+from datetime import datetime
+from sqlalchemy import select, func, case
+from src.models.user import db
+from src.models.indicador import Indicador
+from src.models.indicacao import Indicacao
+from src.models.rollup_diario import RollupDiario
+from src.services.rollup import filtros_rollup
+
+
+def parse_data(valor):
+    """Converte o parâmetro de data (AAAA-MM-DD) usado nos relatórios"""
+    return datetime.strptime(valor, '%Y-%m-%d').date()
+
+
+def parse_uuid(valor):
+    """Converte o parâmetro indicador_id; a coluna UUID não aceita texto"""
+    return valor if isinstance(valor, uuid.UUID) else uuid.UUID(str(valor))
+
+
+def query_indicacoes(data_inicio=None, data_fim=None, indicador_id=None):
+    """Indicações com os dados do indicador, mais recentes primeiro"""
+    query = db.session.query(
+        Indicacao.data_indicacao,
+        Indicador.nome.label('indicador_nome'),
+        Indicador.empresa.label('indicador_empresa'),
+        Indicador.telefone.label('indicador_telefone'),
+        Indicacao.nome_indicado,
+        Indicacao.telefone_indicado,
+        Indicacao.gerou_venda,
+        Indicacao.faturamento_gerado,
+        Indicacao.status_recompensa,
+        Indicacao.observacoes
+    ).join(Indicador)
+
+    if data_inicio:
+        query = query.filter(Indicacao.data_indicacao >= parse_data(data_inicio))
+    if data_fim:
+        query = query.filter(Indicacao.data_indicacao <= parse_data(data_fim))
+    if indicador_id:
+        query = query.filter(Indicacao.indicador_id == parse_uuid(indicador_id))
+
+    return query.order_by(Indicacao.data_indicacao.desc())
+
+
+def query_indicacoes_completas(data_inicio=None, data_fim=None, indicador_id=None):
+    """Indicações com todas as colunas brutas e os dados do indicador (exportações para BI)"""
+    query = db.session.query(
+        Indicacao.id,
+        Indicacao.data_indicacao,
+        Indicacao.nome_indicado,
+        Indicacao.telefone_indicado,
+        Indicacao.gerou_venda,
+        Indicacao.faturamento_gerado,
+        Indicacao.status_recompensa,
+        Indicacao.observacoes,
+        Indicacao.indicador_id,
+        Indicador.nome.label('indicador_nome'),
+        Indicador.telefone.label('indicador_telefone'),
+        Indicador.email.label('indicador_email'),
+        Indicador.empresa.label('indicador_empresa'),
+        Indicacao.created_at,
+        Indicacao.updated_at
+    ).join(Indicador)
+
+    if data_inicio:
+        query = query.filter(Indicacao.data_indicacao >= parse_data(data_inicio))
+    if data_fim:
+        query = query.filter(Indicacao.data_indicacao <= parse_data(data_fim))
+    if indicador_id:
+        query = query.filter(Indicacao.indicador_id == parse_uuid(indicador_id))
+
+    return query.order_by(Indicacao.data_indicacao.desc(), Indicacao.id)
+
+
+ORDENACOES_PERFORMANCE = ('faturamento', 'conversao', 'vendas', 'indicacoes', 'nome')
+
+
+def query_performance(data_inicio=None, data_fim=None, ordenar_por='faturamento', decrescente=True):
+    """Totais por indicador (inclusive sem indicações no período), ordenados no banco
+
+    Lê do rollup diário: o período filtra os dias agregados, não os indicadores.
+    Por padrão, maior faturamento primeiro; empates são desfeitos por nome e id.
+    """
+    if ordenar_por not in ORDENACOES_PERFORMANCE:
+        raise ValueError(f"Ordenação deve ser uma de: {', '.join(ORDENACOES_PERFORMANCE)}")
+
+    totais = select(
+        RollupDiario.indicador_id,
+        func.sum(RollupDiario.total_indicacoes).label('total_indicacoes'),
+        func.sum(RollupDiario.total_vendas).label('total_vendas'),
+        func.sum(RollupDiario.faturamento_total).label('faturamento_total')
+    ).where(*filtros_rollup(
+        parse_data(data_inicio) if data_inicio else None,
+        parse_data(data_fim) if data_fim else None
+    )).group_by(RollupDiario.indicador_id).subquery()
+
+    total_indicacoes = func.coalesce(totais.c.total_indicacoes, 0)
+    total_vendas = func.coalesce(totais.c.total_vendas, 0)
+    faturamento_total = func.coalesce(totais.c.faturamento_total, 0)
+    taxa_conversao = case(
+        (total_indicacoes > 0, total_vendas * 100.0 / total_indicacoes),
+        else_=0
+    )
+
+    query = db.session.query(
+        Indicador.id,
+        Indicador.nome,
+        Indicador.empresa,
+        Indicador.telefone,
+        Indicador.email,
+        total_indicacoes.label('total_indicacoes'),
+        total_vendas.label('total_vendas'),
+        faturamento_total.label('faturamento_total'),
+        taxa_conversao.label('taxa_conversao')
+    ).outerjoin(totais, totais.c.indicador_id == Indicador.id)
+
+    chave = {
+        'faturamento': faturamento_total,
+        'conversao': taxa_conversao,
+        'vendas': total_vendas,
+        'indicacoes': total_indicacoes,
+        'nome': Indicador.nome
+    }[ordenar_por]
+    chave = chave.desc() if decrescente else chave.asc()
+    return query.order_by(chave, Indicador.nome, Indicador.id)
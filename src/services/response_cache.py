@@ -0,0 +1,55 @@
+from functools import wraps
+from flask import current_app, request, Response
+from src.services.versao_dados import versao_atual
+from src.services.cache_versionado import CacheVersionado
+
+MAXIMO_ENTRADAS = 256
+MAXIMO_BYTES = 8 * 1024 * 1024
+TTL = 60  # segundos
+
+_cache = None
+
+
+def cache_respostas():
+    """Cache das respostas JSON dos endpoints de leitura, no processo"""
+    global _cache
+    if _cache is None:
+        _cache = CacheVersionado(
+            current_app.config.get('RESPONSE_CACHE_MAX_ENTRIES', MAXIMO_ENTRADAS),
+            current_app.config.get('RESPONSE_CACHE_MAX_BYTES', MAXIMO_BYTES),
+            ttl=current_app.config.get('RESPONSE_CACHE_TTL', TTL)
+        )
+    return _cache
+
+
+def chave_requisicao():
+    """Caminho + parâmetros normalizados (ordenados, sem valores vazios)"""
+    parametros = tuple(sorted(
+        (nome, valor) for nome, valores in request.args.lists() for valor in valores if valor != ''
+    ))
+    return (request.path, parametros)
+
+
+def resposta_em_cache(view):
+    """Serve a resposta do cache enquanto a versão dos dados não mudar
+
+    Apenas respostas 200 são guardadas; o cabeçalho X-Cache indica HIT ou MISS.
+    """
+    @wraps(view)
+    def wrapper(*args, **kwargs):
+        cache = cache_respostas()
+        chave = chave_requisicao()
+        versao = versao_atual()
+
+        corpo = cache.obter(chave, versao)
+        if corpo is not None:
+            resposta = Response(corpo, mimetype='application/json')
+            resposta.headers['X-Cache'] = 'HIT'
+            return resposta
+
+        resposta = current_app.make_response(view(*args, **kwargs))
+        if resposta.status_code == 200 and versao_atual() == versao:
+            cache.guardar(chave, versao, resposta.get_data())
+        resposta.headers['X-Cache'] = 'MISS'
+        return resposta
+    return wrapper
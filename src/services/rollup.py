@@ -0,0 +1,49 @@
+from sqlalchemy import select, func, case, insert, exists
+from src.models.user import db
+from src.models.indicacao import Indicacao
+from src.models.rollup_diario import RollupDiario, como_dia
+
+
+def filtros_rollup(inicio=None, fim=None, indicador_id=None, status_recompensa=None):
+    """Condições sobre o rollup; datas são comparadas por dia inteiro"""
+    filtros = []
+    if inicio is not None:
+        filtros.append(RollupDiario.dia >= como_dia(inicio))
+    if fim is not None:
+        filtros.append(RollupDiario.dia <= como_dia(fim))
+    if indicador_id is not None:
+        filtros.append(RollupDiario.indicador_id == indicador_id)
+    if status_recompensa is not None:
+        filtros.append(RollupDiario.status_recompensa == status_recompensa)
+    return filtros
+
+
+def reconstruir_rollup(session=None):
+    """Recalcula o rollup inteiro a partir da tabela de indicações"""
+    session = session or db.session
+    vendeu = Indicacao.gerou_venda == True
+    agregado = select(
+        Indicacao.indicador_id,
+        func.date(Indicacao.data_indicacao),
+        Indicacao.status_recompensa,
+        func.count(Indicacao.id),
+        func.sum(case((vendeu, 1), else_=0)),
+        func.coalesce(func.sum(case((vendeu, Indicacao.faturamento_gerado), else_=0)), 0)
+    ).group_by(
+        Indicacao.indicador_id, func.date(Indicacao.data_indicacao), Indicacao.status_recompensa
+    )
+
+    session.execute(RollupDiario.__table__.delete())
+    session.execute(insert(RollupDiario).from_select(
+        ['indicador_id', 'dia', 'status_recompensa', 'total_indicacoes', 'total_vendas', 'faturamento_total'],
+        agregado
+    ))
+    session.commit()
+    return session.query(RollupDiario).count()
+
+
+def rollup_precisa_reconstrucao(session=None):
+    """Rollup vazio com indicações gravadas (banco anterior à criação da tabela)"""
+    session = session or db.session
+    return session.scalar(select(exists().where(Indicacao.id.isnot(None)))) and \
+        not session.scalar(select(exists().where(RollupDiario.dia.isnot(None))))
@@ -0,0 +1,62 @@
+import io
+import csv
+import json
+
+TAMANHO_LOTE = 1000  # linhas buscadas por vez no banco e enviadas por bloco
+
+COLUNAS = [
+    'id', 'data_indicacao', 'nome_indicado', 'telefone_indicado', 'gerou_venda',
+    'faturamento_gerado', 'status_recompensa', 'observacoes', 'indicador_id',
+    'indicador_nome', 'indicador_telefone', 'indicador_email', 'indicador_empresa',
+    'created_at', 'updated_at'
+]
+
+
+def registro_bruto(linha):
+    """Valores crus de uma linha: ids em texto, datas ISO, faturamento em centavos"""
+    return {
+        'id': str(linha.id),
+        'data_indicacao': linha.data_indicacao.isoformat(),
+        'nome_indicado': linha.nome_indicado,
+        'telefone_indicado': linha.telefone_indicado,
+        'gerou_venda': bool(linha.gerou_venda),
+        'faturamento_gerado': linha.faturamento_gerado or 0,
+        'status_recompensa': linha.status_recompensa.value if linha.status_recompensa else None,
+        'observacoes': linha.observacoes,
+        'indicador_id': str(linha.indicador_id),
+        'indicador_nome': linha.indicador_nome,
+        'indicador_telefone': linha.indicador_telefone,
+        'indicador_email': linha.indicador_email,
+        'indicador_empresa': linha.indicador_empresa,
+        'created_at': linha.created_at.isoformat() if linha.created_at else None,
+        'updated_at': linha.updated_at.isoformat() if linha.updated_at else None
+    }
+
+
+def gerar_csv(query, tamanho_lote=TAMANHO_LOTE):
+    """Gera o CSV em blocos de bytes, conforme as linhas chegam do cursor"""
+    buffer = io.StringIO()
+    writer = csv.DictWriter(buffer, fieldnames=COLUNAS)
+    writer.writeheader()
+
+    for numero, linha in enumerate(query.yield_per(tamanho_lote), 1):
+        writer.writerow(registro_bruto(linha))
+        if numero % tamanho_lote == 0:
+            yield buffer.getvalue().encode('utf-8')
+            buffer.seek(0)
+            buffer.truncate()
+
+    yield buffer.getvalue().encode('utf-8')
+
+
+def gerar_ndjson(query, tamanho_lote=TAMANHO_LOTE):
+    """Gera NDJSON (um objeto por linha) em blocos de bytes"""
+    bloco = []
+    for linha in query.yield_per(tamanho_lote):
+        bloco.append(json.dumps(registro_bruto(linha), ensure_ascii=False))
+        if len(bloco) >= tamanho_lote:
+            yield ('\n'.join(bloco) + '\n').encode('utf-8')
+            bloco = []
+
+    if bloco:
+        yield ('\n'.join(bloco) + '\n').encode('utf-8')
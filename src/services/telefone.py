@@ -0,0 +1,118 @@
+import re
+import threading
+import multiprocessing
+from functools import lru_cache
+from itertools import chain
+from concurrent.futures import ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+import pandas as pd
+import phonenumbers
+from phonenumbers import PhoneMetadata
+
+REGIAO_PADRAO = 'BR'
+TAMANHO_CACHE = 50000
+MINIMO_PARALELO = 5000  # abaixo disso o custo de enviar aos processos não compensa
+SHARDS_POR_WORKER = 4
+
+# Caminho rápido: E.164 brasileiro que já casa com o padrão de celular ou fixo
+# dos metadados do phonenumbers é válido e canônico, sem precisar de parse
+_metadados_br = PhoneMetadata.metadata_for_region(REGIAO_PADRAO)
+_E164_BR_VALIDO = re.compile(r'\+55(?:{}|{})'.format(
+    _metadados_br.mobile.national_number_pattern,
+    _metadados_br.fixed_line.national_number_pattern
+))
+
+
+@lru_cache(maxsize=TAMANHO_CACHE)
+def _normalizar_texto(telefone_str):
+    """Normaliza um telefone já convertido em texto; None quando inválido"""
+    if _E164_BR_VALIDO.fullmatch(telefone_str):
+        return telefone_str
+
+    try:
+        parsed = phonenumbers.parse(telefone_str, REGIAO_PADRAO)
+    except phonenumbers.NumberParseException:
+        return None
+
+    if not phonenumbers.is_valid_number(parsed):
+        return None
+    return phonenumbers.format_number(parsed, phonenumbers.PhoneNumberFormat.E164)
+
+
+def normalizar_telefone(telefone):
+    """Normaliza telefone para formato E.164 brasileiro"""
+    if telefone is None or pd.isna(telefone):
+        raise ValueError("Telefone vazio")
+
+    telefone_str = str(telefone).strip()
+    if not telefone_str:
+        raise ValueError("Telefone vazio")
+
+    normalizado = _normalizar_texto(telefone_str)
+    if normalizado is None:
+        raise ValueError("Não foi possível normalizar o telefone")
+    return normalizado
+
+
+def _normalizar_ou_none(telefone):
+    try:
+        return normalizar_telefone(telefone)
+    except ValueError:
+        return None
+
+
+def _normalizar_shard(telefones):
+    """Executado nos processos do pool"""
+    return [_normalizar_ou_none(telefone) for telefone in telefones]
+
+
+_pool = None
+_pool_workers = 0
+_pool_lock = threading.Lock()
+
+
+def _obter_pool(workers):
+    global _pool, _pool_workers
+    with _pool_lock:
+        if _pool is None or _pool_workers != workers:
+            if _pool is not None:
+                _pool.shutdown(wait=False)
+            # spawn: o importador também roda em threads, e fork com threads ativas não é seguro
+            _pool = ProcessPoolExecutor(max_workers=workers, mp_context=multiprocessing.get_context('spawn'))
+            _pool_workers = workers
+        return _pool
+
+
+def _descartar_pool():
+    global _pool
+    with _pool_lock:
+        if _pool is not None:
+            _pool.shutdown(wait=False)
+        _pool = None
+
+
+def normalizar_telefones(telefones, workers=1, minimo_paralelo=MINIMO_PARALELO):
+    """Normaliza uma coleção de telefones; retorna {entrada: E.164 ou None}
+
+    Cada valor distinto é normalizado uma única vez. Com `workers` > 1 e ao menos
+    `minimo_paralelo` valores distintos, os valores são divididos em shards e
+    normalizados em um pool de processos.
+    """
+    distintos = list(set(telefones))
+
+    if workers > 1 and len(distintos) >= minimo_paralelo:
+        tamanho_shard = -(-len(distintos) // (workers * SHARDS_POR_WORKER))
+        shards = [distintos[i:i + tamanho_shard] for i in range(0, len(distintos), tamanho_shard)]
+        try:
+            resultados = _obter_pool(workers).map(_normalizar_shard, shards)
+            return dict(zip(distintos, chain.from_iterable(resultados)))
+        except BrokenProcessPool:
+            # Pool perdido (ex.: processo morto); segue no processo atual
+            _descartar_pool()
+
+    return {telefone: _normalizar_ou_none(telefone) for telefone in distintos}
+
+
+def estatisticas_cache():
+    """Acertos e falhas do cache de normalização"""
+    return _normalizar_texto.cache_info()._asdict()
@@ -0,0 +1,80 @@
+from datetime import date, timedelta
+from sqlalchemy import select, func, cast, Date
+from src.models.user import db
+from src.models.indicacao import StatusRecompensa
+from src.models.rollup_diario import RollupDiario
+from src.services.relatorio_queries import parse_uuid
+from src.services.rollup import filtros_rollup
+
+GRANULARIDADES = ('day', 'week', 'month')
+
+
+def inicio_periodo(coluna, granularidade):
+    """Primeiro dia do período (dia, semana iniciando na segunda ou mês), calculado no banco"""
+    if db.engine.dialect.name == 'sqlite':
+        if granularidade == 'week':
+            return func.date(coluna, '-6 days', 'weekday 1')
+        if granularidade == 'month':
+            return func.date(coluna, 'start of month')
+        return func.date(coluna)
+    if granularidade == 'day':
+        return coluna
+    return cast(func.date_trunc(granularidade, coluna), Date)
+
+
+def _proximo_periodo(dia, granularidade):
+    if granularidade == 'day':
+        return dia + timedelta(days=1)
+    if granularidade == 'week':
+        return dia + timedelta(weeks=1)
+    return date(dia.year + dia.month // 12, dia.month % 12 + 1, 1)
+
+
+def _como_date(valor):
+    return valor if isinstance(valor, date) else date.fromisoformat(str(valor)[:10])
+
+
+def serie_kpis(granularidade='day', inicio=None, fim=None, indicador_id=None, status_recompensa=None):
+    """KPIs agregados por período no banco, em arrays paralelos
+
+    Períodos sem indicações entre o primeiro e o último aparecem zerados, para
+    o gráfico ter um eixo contínuo.
+    """
+    if granularidade not in GRANULARIDADES:
+        raise ValueError(f"granularity deve ser um de: {', '.join(GRANULARIDADES)}")
+
+    periodo = inicio_periodo(RollupDiario.dia, granularidade).label('periodo')
+    query = select(
+        periodo,
+        func.sum(RollupDiario.total_indicacoes),
+        func.sum(RollupDiario.total_vendas),
+        func.sum(RollupDiario.faturamento_total)
+    ).where(*filtros_rollup(
+        inicio, fim,
+        parse_uuid(indicador_id) if indicador_id else None,
+        StatusRecompensa(status_recompensa) if status_recompensa else None
+    )).group_by(periodo).order_by(periodo)
+
+    totais = {_como_date(linha[0]): linha[1:] for linha in db.session.execute(query)}
+
+    serie = {
+        'granularity': granularidade,
+        'periodos': [],
+        'total_indicacoes': [],
+        'total_vendas': [],
+        'faturamento_total': [],
+        'taxa_conversao': []
+    }
+    if not totais:
+        return serie
+
+    dia, ultimo = min(totais), max(totais)
+    while dia <= ultimo:
+        indicacoes, vendas, faturamento = totais.get(dia, (0, 0, 0))
+        serie['periodos'].append(dia.isoformat())
+        serie['total_indicacoes'].append(indicacoes or 0)
+        serie['total_vendas'].append(vendas or 0)
+        serie['faturamento_total'].append(faturamento or 0)
+        serie['taxa_conversao'].append(round(vendas / indicacoes * 100, 2) if indicacoes else 0)
+        dia = _proximo_periodo(dia, granularidade)
+    return serie
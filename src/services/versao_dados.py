@@ -0,0 +1,65 @@
+from sqlalchemy import event, select, update, cast, Integer, String
+from sqlalchemy.orm import Session
+from src.models.user import db
+from src.models.config import Config
+from src.models.indicador import Indicador
+from src.models.indicacao import Indicacao
+
+# Tabelas cujos dados alimentam relatórios, dashboards e exportações
+TABELAS_MONITORADAS = {Indicador.__tablename__, Indicacao.__tablename__, 'rollup_indicacoes_diario'}
+
+# Chave da tabela config; persistida no banco para valer entre workers
+CHAVE_VERSAO = 'versao_dados'
+
+
+def garantir_versao(session=None):
+    """Cria o registro da versão, se ainda não existir (chamado na inicialização)"""
+    session = session or db.session
+    if session.scalar(select(Config.id).where(Config.key == CHAVE_VERSAO)) is None:
+        session.add(Config(key=CHAVE_VERSAO, value='0'))
+        session.commit()
+
+
+def versao_atual(session=None):
+    """Versão dos dados de indicações/indicadores; muda a cada transação que os altera"""
+    session = session or db.session
+    valor = session.scalar(select(Config.value).where(Config.key == CHAVE_VERSAO))
+    return int(valor) if valor is not None else 0
+
+
+def _incrementar_na_transacao(session):
+    # Uma vez por transação, na mesma transação da alteração: a versão nova só
+    # fica visível junto com os dados novos e é desfeita num rollback
+    if session.info.get('versao_incrementada'):
+        return
+    session.info['versao_incrementada'] = True
+    session.connection().execute(
+        update(Config)
+        .where(Config.key == CHAVE_VERSAO)
+        .values(value=cast(cast(Config.value, Integer) + 1, String))
+    )
+
+
+@event.listens_for(Session, 'after_flush')
+def _verificar_flush(session, flush_context):
+    """Alterações feitas pelo ORM (add, atributos, delete)"""
+    for objeto in list(session.new) + list(session.dirty) + list(session.deleted):
+        if isinstance(objeto, (Indicador, Indicacao)):
+            _incrementar_na_transacao(session)
+            return
+
+
+@event.listens_for(Session, 'do_orm_execute')
+def _verificar_execucao(orm_execute_state):
+    """INSERT/UPDATE/DELETE em lote via session.execute (importação, resolver de indicadores)"""
+    if not (orm_execute_state.is_insert or orm_execute_state.is_update or orm_execute_state.is_delete):
+        return
+    tabela = getattr(orm_execute_state.statement, 'table', None)
+    if getattr(tabela, 'name', None) in TABELAS_MONITORADAS:
+        _incrementar_na_transacao(orm_execute_state.session)
+
+
+@event.listens_for(Session, 'after_commit')
+@event.listens_for(Session, 'after_rollback')
+def _encerrar_transacao(session):
+    session.info.pop('versao_incrementada', None)
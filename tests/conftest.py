@@ -0,0 +1,43 @@
+import os
+import sys
+
+import pytest
+from flask import Flask
+
+# Permite `import src...` rodando o pytest da raiz do projeto
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+
+@pytest.fixture
+def app(tmp_path):
+    """Aplicação com a configuração de src.main e um banco SQLite vazio próprio do teste"""
+    # Importar src.main registra modelos e blueprints; o banco só é aberto em preparar_banco
+    from src.main import app as aplicacao, preparar_banco
+    from src.models.user import db
+    from src.services.response_cache import cache_respostas
+    from src.services.export_cache import cache_exportacoes
+
+    app = Flask(__name__)
+    app.config.update(aplicacao.config)
+    app.config.update(
+        TESTING=True,
+        SQLALCHEMY_DATABASE_URI=f"sqlite:///{tmp_path / 'app.db'}",
+        IMPORT_JOBS_DIR=str(tmp_path / 'import_jobs'),
+        EXPORT_JOBS_DIR=str(tmp_path / 'export_jobs')
+    )
+    db.init_app(app)
+    for blueprint in aplicacao.blueprints.values():
+        app.register_blueprint(blueprint, url_prefix='/api')
+
+    with app.app_context():
+        preparar_banco()
+        # Caches do processo: cada banco de teste começa na mesma versão de dados
+        cache_respostas().limpar()
+        cache_exportacoes().limpar()
+        yield app
+        db.session.remove()
+
+
+@pytest.fixture
+def client(app):
+    return app.test_client()
@@ -0,0 +1,39 @@
+import pytest
+
+from src.models.user import db
+from src.models.indicador import Indicador
+from src.models.telefone_busca import somente_digitos
+
+
+@pytest.fixture
+def indicadores(app):
+    for nome, telefone in (('Ana', '+5511987654321'), ('Bruno', '+5555991234567'), ('Carla', '+5521912345555')):
+        db.session.add(Indicador(nome=nome, telefone=telefone))
+    db.session.commit()
+
+
+def _buscar(client, termo):
+    resposta = client.get('/api/indicadores', query_string={'search': termo, 'per_page': 50})
+    assert resposta.status_code == 200
+    return sorted(indicador['nome'] for indicador in resposta.get_json()['indicadores'])
+
+
+@pytest.mark.parametrize('termo, esperados', [
+    ('+55', []),  # só o código do país não filtra telefones (nem devolve a tabela inteira)
+    ('+55 ', []),
+    ('55', ['Bruno', 'Carla']),  # DDD 55 ou final 55
+    ('11', ['Ana']),  # DDD
+    ('(21) 9', ['Carla']),
+    ('98765', ['Ana']),  # número sem DDD
+    ('4321', ['Ana']),  # final do número
+    ('+55 11 98765-4321', ['Ana']),
+])
+def test_busca_por_telefone(client, indicadores, termo, esperados):
+    assert _buscar(client, termo) == esperados
+
+
+def test_somente_digitos():
+    assert somente_digitos('+55') == ''
+    assert somente_digitos('55') == '55'
+    assert somente_digitos('+5511987654321') == '11987654321'
+    assert somente_digitos('(11) 98765-4321') == '11987654321'
@@ -0,0 +1,53 @@
+import time
+import uuid
+from datetime import datetime, timedelta
+
+from src.models.user import db
+from src.models.export_job import ExportJob
+from src.models.import_job import StatusJob
+
+
+def _job_abandonado(ha=timedelta(hours=1)):
+    """Exportação "em processamento" de um worker que morreu há `ha`"""
+    job = ExportJob(id=uuid.uuid4(), formato='xlsx', tipo='indicadores', status=StatusJob.PROCESSANDO)
+    db.session.add(job)
+    db.session.commit()
+    db.session.execute(
+        db.update(ExportJob).where(ExportJob.id == job.id).values(updated_at=datetime.utcnow() - ha)
+    )
+    db.session.commit()
+    return str(job.id)
+
+
+def _aguardar(client, *job_ids, status='Concluido', tempo=10):
+    limite = time.monotonic() + tempo
+    while True:
+        atuais = [client.get(f'/api/export/jobs/{job_id}').get_json()['status'] for job_id in job_ids]
+        if all(atual == status for atual in atuais) or time.monotonic() > limite:
+            return atuais
+        time.sleep(0.05)
+
+
+def test_job_abandonado_nao_ocupa_a_vaga(app, client):
+    app.config['EXPORT_JOB_WORKERS'] = 1
+    abandonado = _job_abandonado()
+
+    resposta = client.get('/api/export/excel?async=1&tipo=indicadores')
+    assert resposta.status_code == 202
+
+    # O novo job roda e o abandonado volta para a fila e também é gerado
+    assert _aguardar(client, resposta.get_json()['job_id'], abandonado) == ['Concluido', 'Concluido']
+
+
+def test_consulta_de_status_reenfileira_job_abandonado(app, client):
+    abandonado = _job_abandonado()
+
+    assert client.get(f'/api/export/jobs/{abandonado}').get_json()['status'] in ('Pendente', 'Processando',
+                                                                                  'Concluido')
+    assert _aguardar(client, abandonado) == ['Concluido']
+
+
+def test_job_com_heartbeat_recente_nao_e_reenfileirado(app, client):
+    vivo = _job_abandonado(ha=timedelta(seconds=10))
+
+    assert client.get(f'/api/export/jobs/{vivo}').get_json()['status'] == 'Processando'
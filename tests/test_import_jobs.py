@@ -0,0 +1,53 @@
+import uuid
+from datetime import datetime, timedelta
+
+import pandas as pd
+
+from src.models.user import db
+from src.models.import_job import ImportJob, StatusJob
+from src.services.import_runner import importar_lotes
+
+
+def _job_processando(ha):
+    job = ImportJob(id=uuid.uuid4(), nome_arquivo='planilha.xls', caminho_arquivo='/inexistente.xls',
+                    tamanho_chunk=10, status=StatusJob.PROCESSANDO)
+    db.session.add(job)
+    db.session.commit()
+    db.session.execute(
+        db.update(ImportJob).where(ImportJob.id == job.id).values(updated_at=datetime.utcnow() - ha)
+    )
+    db.session.commit()
+    return str(job.id)
+
+
+def test_consulta_de_status_encerra_job_abandonado(client):
+    abandonado = _job_processando(timedelta(hours=1))
+
+    job = client.get(f'/api/import/jobs/{abandonado}').get_json()
+
+    assert job['status'] == 'Erro'
+    assert 'interrompida' in job['erro']
+
+
+def test_job_com_heartbeat_recente_continua_processando(client):
+    vivo = _job_processando(timedelta(seconds=10))
+
+    assert client.get(f'/api/import/jobs/{vivo}').get_json()['status'] == 'Processando'
+
+
+def test_progresso_a_cada_chunk_de_um_lote_unico(app):
+    # Um .xls é lido em um único lote: o heartbeat não pode esperar o fim dele
+    planilha = pd.DataFrame({
+        'Data': ['01/02/2024'] * 25,
+        'Indicador': [f'Indicador {i}' for i in range(25)],
+        'Telefone Indicador': [f'119876{i:05d}' for i in range(25)],
+        'Indicado': [f'Indicado {i}' for i in range(25)],
+        'Telefone Indicado': [f'119765{i:05d}' for i in range(25)],
+    })
+    progresso = []
+
+    relatorio = importar_lotes([planilha], 5, lambda *valores: progresso.append(valores))
+
+    assert relatorio['linhas_criadas'] == 25
+    # Depois da validação e de cada um dos 5 chunks
+    assert [criadas for _, criadas, _ in progresso] == [0, 5, 10, 15, 20, 25]
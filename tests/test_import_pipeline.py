@@ -0,0 +1,229 @@
+import io
+import re
+from datetime import datetime
+
+import pandas as pd
+import phonenumbers
+import pytest
+
+from src.models.indicacao import StatusRecompensa
+from src.services.import_pipeline import validar_planilha, converter_datas
+from src.services.import_readers import lotes_excel, lotes_ndjson
+
+
+# Regras linha a linha da importação original, usadas como referência
+def _normalizar_telefone_original(telefone):
+    if pd.isna(telefone):
+        raise ValueError("Telefone vazio")
+    telefone_str = str(telefone).strip()
+    if not telefone_str:
+        raise ValueError("Telefone vazio")
+    try:
+        parsed = phonenumbers.parse(telefone_str, 'BR')
+        if phonenumbers.is_valid_number(parsed):
+            return phonenumbers.format_number(parsed, phonenumbers.PhoneNumberFormat.E164)
+        raise ValueError("Telefone inválido")
+    except Exception:
+        raise ValueError("Não foi possível normalizar o telefone")
+
+
+def _validar_linha_original(row):
+    """None para linha vazia, mensagem de erro ou a tupla de valores gravados"""
+    if pd.isna(row).all():
+        return None
+
+    data_indicacao = row.get('Data da Indicação') or row.get('Data')
+    nome_indicador = row.get('Nome do Cliente Indicador') or row.get('Indicador')
+    telefone_indicador = row.get('Telefone do Cliente Indicador') or row.get('Telefone Indicador')
+    nome_indicado = row.get('Nome da Indicação') or row.get('Indicado')
+    telefone_indicado = row.get('Telefone da Indicação') or row.get('Telefone Indicado')
+    gerou_venda = row.get('Gerou Venda?') or row.get('Venda')
+    faturamento = row.get('Faturamento Gerado') or row.get('Faturamento')
+
+    if pd.isna(data_indicacao) or pd.isna(nome_indicador) or pd.isna(nome_indicado):
+        return 'Dados obrigatórios faltando'
+
+    if isinstance(data_indicacao, str):
+        try:
+            data_indicacao = datetime.strptime(data_indicacao, '%d/%m/%Y')
+        except ValueError:
+            try:
+                data_indicacao = datetime.strptime(data_indicacao, '%Y-%m-%d')
+            except ValueError:
+                return 'Formato de data inválido'
+
+    try:
+        telefone_indicador_norm = _normalizar_telefone_original(telefone_indicador)
+        telefone_indicado_norm = _normalizar_telefone_original(telefone_indicado)
+    except ValueError:
+        return 'Telefone inválido'
+
+    gerou_venda_bool = False
+    faturamento_centavos = 0
+    if not pd.isna(gerou_venda):
+        gerou_venda_bool = str(gerou_venda).lower() in ['sim', 'yes', 'true', '1']
+    if gerou_venda_bool and not pd.isna(faturamento):
+        try:
+            faturamento_str = str(faturamento).replace('R$', '').replace('.', '').replace(',', '.')
+            faturamento_centavos = int(float(re.sub(r'[^\d,.]', '', faturamento_str)) * 100)
+        except ValueError:
+            faturamento_centavos = 0
+
+    status = StatusRecompensa.EM_PROCESSAMENTO if gerou_venda_bool else StatusRecompensa.NAO
+    return (
+        pd.Timestamp(data_indicacao), nome_indicador, telefone_indicador_norm, nome_indicado,
+        telefone_indicado_norm, gerou_venda_bool, faturamento_centavos, status
+    )
+
+
+def _validar_vetorizado(df):
+    planilha = validar_planilha(df)
+    resultado = []
+    for indice in df.index:
+        if planilha.vazias[indice]:
+            resultado.append(None)
+        elif planilha.erros[indice] is not None:
+            resultado.append(planilha.erros[indice])
+        else:
+            linha = planilha.frame.loc[indice]
+            resultado.append((
+                linha['data_indicacao'], linha['nome_indicador'], linha['telefone_indicador'],
+                linha['nome_indicado'], linha['telefone_indicado'], bool(linha['gerou_venda']),
+                int(linha['faturamento_gerado']), linha['status_recompensa']
+            ))
+    return resultado
+
+
+def _assert_paridade(df):
+    esperado = [_validar_linha_original(row) for _, row in df.iterrows()]
+    assert _validar_vetorizado(df) == esperado
+    return esperado
+
+
+def test_paridade_datas_em_texto_e_invalidas():
+    df = pd.DataFrame({
+        'Data da Indicação': ['15/03/2024', '2024-03-16', '31/02/2024', 'ontem', None],
+        'Nome do Cliente Indicador': ['Ana', 'Ana', 'Bia', 'Caio', 'Duda'],
+        'Telefone do Cliente Indicador': ['11987654321'] * 5,
+        'Nome da Indicação': ['Edu', 'Fábio', 'Gil', 'Hugo', 'Ivo'],
+        'Telefone da Indicação': ['(11) 97654-3210'] * 5,
+        'Gerou Venda?': ['Sim', 'não', 'Sim', 'Sim', 'Sim'],
+        'Faturamento Gerado': ['R$ 1.234,56', '10', '5', '5', '5'],
+    })
+    esperado = _assert_paridade(df)
+    assert esperado[2] == 'Formato de data inválido'
+    assert esperado[4] == 'Dados obrigatórios faltando'
+
+
+def test_paridade_datas_do_excel():
+    df = pd.DataFrame({
+        'Data': pd.to_datetime(['2024-01-05', '2024-02-10', None]),
+        'Indicador': ['Ana', 'Bia', 'Caio'],
+        'Telefone Indicador': ['11987654321', '21987654321', '11987654321'],
+        'Indicado': ['Edu', 'Fábio', 'Gil'],
+        'Telefone Indicado': ['11976543210', '11976543210', '11976543210'],
+        'Venda': ['Sim', 'Não', 'Sim'],
+        'Faturamento': [100.5, 0, 30],
+    })
+    esperado = _assert_paridade(df)
+    assert esperado[0][0] == pd.Timestamp('2024-01-05')
+    assert esperado[2] == 'Dados obrigatórios faltando'
+
+
+def test_paridade_datas_mistas_em_lote_streaming():
+    # Lotes do modo streaming são dtype=object com datetime nativo
+    df = pd.DataFrame({
+        'Data': [datetime(2024, 1, 5), '06/01/2024', datetime(2024, 1, 7)],
+        'Indicador': ['Ana', 'Ana', 'Ana'],
+        'Telefone Indicador': ['11987654321'] * 3,
+        'Indicado': ['Edu', 'Fábio', 'Gil'],
+        'Telefone Indicado': ['11976543210'] * 3,
+        'Venda': [None, None, None],
+        'Faturamento': [None, None, None],
+    }, dtype=object)
+    _assert_paridade(df)
+
+
+def test_paridade_telefones_float_e_invalidos():
+    df = pd.DataFrame({
+        'Data': ['2024-01-05'] * 5,
+        'Indicador': ['Ana'] * 5,
+        'Telefone Indicador': [11987654321.0, 11987654321.0, 123.0, None, 5511987654321.0],
+        'Indicado': ['Edu', 'Fábio', 'Gil', 'Hugo', 'Ivo'],
+        'Telefone Indicado': [11976543210.0, 'abc', 11976543210.0, 11976543210.0, 11976543210.0],
+        'Venda': ['1', 'true', 'YES', 'x', 'Sim'],
+        'Faturamento': ['50', '20', '10', '10', 'R$ abc'],
+    })
+    esperado = _assert_paridade(df)
+    assert esperado[1] == 'Telefone inválido'
+    assert esperado[2] == 'Telefone inválido'
+    assert esperado[3] == 'Telefone inválido'
+
+
+def test_paridade_linhas_vazias_e_colunas_alternativas():
+    df = pd.DataFrame({
+        'Data da Indicação': [None, None, '2024-01-05'],
+        'Data': [None, '2024-01-06', '2024-01-07'],
+        'Indicador': [None, 'Ana', 'Bia'],
+        'Telefone Indicador': [None, '11987654321', '11987654321'],
+        'Indicado': [None, 'Edu', 'Fábio'],
+        'Telefone Indicado': [None, '11976543210', '11976543210'],
+    })
+    esperado = _assert_paridade(df)
+    assert esperado[0] is None
+
+
+def test_converter_datas_sem_textos():
+    datas = pd.Series(pd.to_datetime(['2024-01-02', None]))
+    convertidas = converter_datas(datas)
+    assert convertidas[0] == pd.Timestamp('2024-01-02')
+    assert pd.isna(convertidas[1])
+
+
+def _xlsx_com_datas():
+    df = pd.DataFrame({
+        'Data': pd.to_datetime(['2024-01-05', '2024-01-06', '2024-01-07']),
+        'Indicador': ['Ana', 'Ana', 'Bia'],
+        'Telefone Indicador': ['11987654321', '11987654321', '21987654321'],
+        'Indicado': ['Edu', 'Fábio', 'Gil'],
+        'Telefone Indicado': ['11976543210', '11976543211', '11976543212'],
+        'Venda': ['Sim', 'Não', 'Sim'],
+        'Faturamento': [100, 0, 250],
+    })
+    arquivo = io.BytesIO()
+    df.to_excel(arquivo, index=False)
+    arquivo.seek(0)
+    return arquivo
+
+
+@pytest.mark.parametrize('leitura', ['pandas', 'streaming'])
+def test_planilha_com_celulas_de_data(leitura):
+    arquivo = _xlsx_com_datas()
+    if leitura == 'pandas':
+        lotes = [pd.read_excel(arquivo)]
+    else:
+        lotes = list(lotes_excel(arquivo, 2))
+
+    validas = pd.concat([validar_planilha(lote).validas for lote in lotes])
+    assert len(validas) == 3
+    assert list(validas['data_indicacao']) == list(pd.to_datetime(['2024-01-05', '2024-01-06', '2024-01-07']))
+    assert list(validas['faturamento_gerado']) == [10000, 0, 25000]
+
+
+def test_ndjson_com_linhas_ilegiveis():
+    conteudo = '\n'.join([
+        '{"Data": "01/02/2024", "Indicador": "Ana", "Telefone Indicador": "11987654321", '
+        '"Indicado": "Bia", "Telefone Indicado": "11976543210"}',
+        '{"Data": "01/02/2024", "Indicador": "Ana"',
+        '',
+        '[1, 2]',
+        '{"Data": "2024-02-03", "Indicador": "Caio", "Telefone Indicador": "11987654321", '
+        '"Indicado": "Duda", "Telefone Indicado": "11976543210"}',
+    ]).encode('utf-8')
+
+    lotes = list(lotes_ndjson(io.BytesIO(conteudo), tamanho_lote=2))
+    erros = pd.concat([validar_planilha(lote).erros for lote in lotes])
+    vazias = pd.concat([validar_planilha(lote).vazias for lote in lotes])
+
+    assert erros.to_dict() == {0: None, 1: 'JSON inválido', 2: None, 3: 'Esperado um objeto JSON', 4: None}
+    assert vazias.tolist() == [False, False, True, False, False]
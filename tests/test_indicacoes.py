@@ -0,0 +1,131 @@
+import base64
+import json
+import uuid
+from datetime import datetime
+
+import pandas as pd
+import pytest
+from sqlalchemy import event, select
+
+from src.models.user import db
+from src.models.indicador import Indicador
+from src.models.indicacao import Indicacao
+from src.models.import_fingerprint import ImportFingerprint
+from src.services.import_runner import importar_lotes
+
+
+@pytest.fixture
+def chaves_estrangeiras(app):
+    """Liga a verificação de chaves estrangeiras do SQLite, como no Postgres"""
+    def ligar(conexao_dbapi, registro):
+        conexao_dbapi.execute('PRAGMA foreign_keys=ON')
+
+    event.listen(db.engine, 'connect', ligar)
+    db.session.remove()
+    db.engine.dispose()  # conexões já abertas não passam pelo evento
+    yield
+    event.remove(db.engine, 'connect', ligar)
+    db.engine.dispose()
+
+
+def _importar(linhas):
+    return importar_lotes([pd.DataFrame(linhas)], 100)
+
+
+def test_excluir_indicacao_importada(client, chaves_estrangeiras):
+    linha = {'Data': '01/02/2024', 'Indicador': 'Ana', 'Telefone Indicador': '11987654321',
+             'Indicado': 'Bia', 'Telefone Indicado': '11976543210'}
+    assert _importar([linha])['linhas_criadas'] == 1
+    indicacao_id = db.session.scalar(select(Indicacao.id))
+
+    assert client.delete(f'/api/indicacoes/{indicacao_id}').status_code == 200
+    assert db.session.scalar(select(ImportFingerprint.fingerprint)) is None
+
+    # Sem o fingerprint, a mesma linha pode ser importada de novo
+    assert _importar([linha])['linhas_criadas'] == 1
+
+
+@pytest.fixture
+def indicacoes_empatadas(app):
+    """Cinco indicações no mesmo instante e duas em outros dias; ids em ordem decrescente de listagem"""
+    indicador = Indicador(nome='Ana', telefone='+5511987654321')
+    db.session.add(indicador)
+    datas = [datetime(2024, 2, 1, 10, 0)] * 5 + [datetime(2024, 3, 1), datetime(2024, 1, 1)]
+    indicacoes = [
+        Indicacao(id=uuid.uuid4(), indicador=indicador, data_indicacao=data, nome_indicado=f'Indicado {i}',
+                  telefone_indicado='+5511976543210')
+        for i, data in enumerate(datas)
+    ]
+    db.session.add_all(indicacoes)
+    db.session.commit()
+    ordem = sorted(indicacoes, key=lambda indicacao: (indicacao.data_indicacao, indicacao.id), reverse=True)
+    return [str(indicacao.id) for indicacao in ordem]
+
+
+def _percorrer(client, per_page):
+    ids, cursor, paginas = [], '', 0
+    while cursor is not None:
+        resposta = client.get('/api/indicacoes', query_string={'cursor': cursor, 'per_page': per_page})
+        assert resposta.status_code == 200
+        pagina = resposta.get_json()
+        assert len(pagina['indicacoes']) <= pagina['per_page']
+        ids += [indicacao['id'] for indicacao in pagina['indicacoes']]
+        cursor = pagina['next_cursor']
+        paginas += 1
+    return ids, paginas
+
+
+@pytest.mark.parametrize('per_page', [1, 2, 3, 7, 50])
+def test_cursor_com_datas_empatadas(client, indicacoes_empatadas, per_page):
+    # Empates na data são desfeitos pelo id: nenhuma linha repetida ou pulada entre páginas
+    ids, paginas = _percorrer(client, per_page)
+
+    assert ids == indicacoes_empatadas
+    assert paginas == -(-len(ids) // per_page)  # a última página já vem com next_cursor nulo
+
+
+def test_cursor_ultima_pagina_sem_proximo(client, indicacoes_empatadas):
+    pagina = client.get('/api/indicacoes?cursor=&per_page=7').get_json()
+
+    assert len(pagina['indicacoes']) == 7
+    assert pagina['next_cursor'] is None
+
+
+def test_cursor_tamanho_de_pagina_minimo(client, indicacoes_empatadas):
+    pagina = client.get('/api/indicacoes?cursor=&per_page=0').get_json()
+
+    assert pagina['per_page'] == 1
+    assert [indicacao['id'] for indicacao in pagina['indicacoes']] == indicacoes_empatadas[:1]
+
+
+def _cursor(valor):
+    return base64.urlsafe_b64encode(json.dumps(valor).encode('utf-8')).decode('ascii').rstrip('=')
+
+
+@pytest.mark.parametrize('cursor', [
+    'nao-e-base64!',
+    base64.urlsafe_b64encode(b'\xff\xfe').decode('ascii'),  # não é UTF-8
+    _cursor({'data': '2024-02-01'}),  # não é lista
+    _cursor(['2024-02-01T10:00:00']),  # faltando o id
+    _cursor(['ontem', str(uuid.uuid4())]),  # data inválida
+    _cursor(['2024-02-01T10:00:00', 'nao-e-uuid']),
+])
+def test_cursor_invalido(client, indicacoes_empatadas, cursor):
+    resposta = client.get('/api/indicacoes', query_string={'cursor': cursor})
+
+    assert resposta.status_code == 400
+    assert resposta.get_json() == {'error': 'Cursor inválido'}
+
+
+def test_cursor_de_indicadores_com_nomes_empatados(client, app):
+    db.session.add_all([Indicador(id=uuid.uuid4(), nome='Ana', telefone=f'+551198765432{i}') for i in range(5)])
+    db.session.commit()
+    esperados = sorted(str(indicador.id) for indicador in db.session.scalars(select(Indicador)))
+
+    ids, cursor = [], ''
+    while cursor is not None:
+        pagina = client.get('/api/indicadores', query_string={'cursor': cursor, 'per_page': 2}).get_json()
+        ids += [indicador['id'] for indicador in pagina['indicadores']]
+        cursor = pagina['next_cursor']
+
+    assert ids == esperados
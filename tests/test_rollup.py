@@ -0,0 +1,132 @@
+from collections import defaultdict
+
+import pandas as pd
+import pytest
+from sqlalchemy import select
+
+from src.models.user import db
+from src.models.indicador import Indicador
+from src.models.indicacao import Indicacao
+from src.models.rollup_diario import RollupDiario
+from src.services.import_runner import importar_lotes
+from src.services.versao_dados import versao_atual
+
+
+# Agregado direto sobre as indicações, usado como referência
+def _agregado_direto():
+    totais = defaultdict(lambda: (0, 0, 0))
+    for indicacao in db.session.scalars(select(Indicacao)):
+        chave = (indicacao.indicador_id, indicacao.data_indicacao.date(), indicacao.status_recompensa)
+        vendeu = bool(indicacao.gerou_venda)
+        valores = (1, int(vendeu), indicacao.faturamento_gerado if vendeu else 0)
+        totais[chave] = tuple(a + v for a, v in zip(totais[chave], valores))
+    return dict(totais)
+
+
+def _rollup():
+    return {
+        (linha.indicador_id, linha.dia, linha.status_recompensa):
+            (linha.total_indicacoes, linha.total_vendas, linha.faturamento_total)
+        for linha in db.session.scalars(select(RollupDiario))
+    }
+
+
+def _assert_paridade():
+    db.session.expire_all()
+    assert _rollup() == _agregado_direto()
+
+
+@pytest.fixture
+def indicador_id(app):
+    indicador = Indicador(nome='Ana', telefone='+5511987654321')
+    db.session.add(indicador)
+    db.session.commit()
+    return str(indicador.id)
+
+
+def _criar(client, indicador_id, data, **campos):
+    resposta = client.post('/api/indicacoes', json={
+        'indicador_id': indicador_id, 'data_indicacao': data, 'nome_indicado': 'Bia',
+        'telefone_indicado': '11976543210', **campos
+    })
+    assert resposta.status_code == 201, resposta.get_json()
+    return resposta.get_json()['id']
+
+
+def _alterar(client, indicacao_id, **campos):
+    resposta = client.patch(f'/api/indicacoes/{indicacao_id}', json=campos)
+    assert resposta.status_code == 200, resposta.get_json()
+
+
+def test_paridade_rollup_em_alteracoes_pelo_orm(client, indicador_id):
+    primeira = _criar(client, indicador_id, '2024-02-01T10:00:00')
+    segunda = _criar(client, indicador_id, '2024-02-01T15:00:00', gerou_venda=True, faturamento_gerado=5000)
+    _assert_paridade()
+
+    _alterar(client, primeira, data_indicacao='2024-03-05T09:00:00')
+    _assert_paridade()
+
+    outro = Indicador(nome='Caio', telefone='+5521987654321')
+    db.session.add(outro)
+    db.session.commit()
+    _alterar(client, primeira, indicador_id=str(outro.id))
+    _assert_paridade()
+
+    _alterar(client, primeira, gerou_venda=True, faturamento_gerado=12000)
+    _assert_paridade()
+
+    _alterar(client, segunda, status_recompensa='Sim')
+    _assert_paridade()
+
+    _alterar(client, primeira, gerou_venda=False)
+    _assert_paridade()
+
+    assert client.delete(f'/api/indicacoes/{segunda}').status_code == 200
+    _assert_paridade()
+
+    assert client.delete(f'/api/indicacoes/{primeira}').status_code == 200
+    assert _rollup() == {}
+
+
+def test_paridade_rollup_na_importacao_em_lote(client, indicador_id):
+    _criar(client, indicador_id, '2024-02-01T10:00:00')
+    planilha = pd.DataFrame({
+        'Data': ['01/02/2024', '01/02/2024', '02/02/2024', '02/02/2024'],
+        'Indicador': ['Ana', 'Ana', 'Ana', 'Caio'],
+        'Telefone Indicador': ['11987654321', '11987654321', '11987654321', '21987654321'],
+        'Indicado': ['Duda', 'Enzo', 'Fabi', 'Gabi'],
+        'Telefone Indicado': ['11911111111', '11922222222', '11933333333', '11944444444'],
+        'Gerou Venda?': ['Sim', 'Não', 'Sim', 'Sim'],
+        'Faturamento Gerado': ['R$ 1.000,00', '', 'R$ 250,50', 'R$ 10,00'],
+    })
+
+    # Chunks de 2: o rollup é atualizado por deltas em mais de uma transação
+    relatorio = importar_lotes([planilha], 2)
+
+    assert relatorio['linhas_criadas'] == 4
+    _assert_paridade()
+
+
+def test_escrita_incrementa_versao_e_invalida_cache(client, indicador_id):
+    assert client.get('/api/dashboard').headers['X-Cache'] == 'MISS'
+    assert client.get('/api/dashboard').headers['X-Cache'] == 'HIT'
+    versao = versao_atual()
+
+    _criar(client, indicador_id, '2024-02-01T10:00:00')
+
+    assert versao_atual() == versao + 1
+    resposta = client.get('/api/dashboard')
+    assert resposta.headers['X-Cache'] == 'MISS'
+    assert resposta.get_json()['total_indicados'] == 1
+
+
+def test_importacao_em_lote_incrementa_versao(app, indicador_id):
+    versao = versao_atual()
+    planilha = pd.DataFrame({
+        'Data': ['01/02/2024'], 'Indicador': ['Ana'], 'Telefone Indicador': ['11987654321'],
+        'Indicado': ['Bia'], 'Telefone Indicado': ['11976543210'],
+    })
+
+    importar_lotes([planilha], 100)
+
+    assert versao_atual() > versao
@@ -0,0 +1,45 @@
+from src.services import telefone
+from src.services.telefone import MINIMO_PARALELO
+
+
+class _PoolNoProcesso:
+    """Substitui o pool de processos, registrando os shards recebidos"""
+
+    def __init__(self):
+        self.shards = []
+
+    def map(self, funcao, shards):
+        self.shards.extend(shards)
+        return map(funcao, shards)
+
+
+def _csv(linhas):
+    cabecalho = 'Data,Indicador,Telefone Indicador,Indicado,Telefone Indicado'
+    return '\n'.join([cabecalho] + [
+        f'01/02/2024,Indicador {i},1198{i:07d},Indicado {i},1197{i:07d}' for i in range(linhas)
+    ]).encode('utf-8')
+
+
+def test_importacao_em_streaming_usa_o_pool(app, client, monkeypatch):
+    pool = _PoolNoProcesso()
+    monkeypatch.setattr(telefone, '_obter_pool', lambda workers: pool)
+    app.config.update(IMPORT_PHONE_WORKERS=2, IMPORT_CHUNK_SIZE=1000)
+
+    # Dois telefones distintos por linha: o arquivo inteiro passa do mínimo do pool,
+    # mas um chunk de gravação (1000 linhas) sozinho não
+    linhas = MINIMO_PARALELO // 2 + 500
+    resposta = client.post('/api/import/csv', data=_csv(linhas))
+
+    assert resposta.status_code == 200
+    assert resposta.get_json()['relatorio']['linhas_criadas'] == linhas
+    assert sum(len(shard) for shard in pool.shards) == 2 * linhas
+
+
+def test_lote_pequeno_nao_usa_o_pool(monkeypatch):
+    pool = _PoolNoProcesso()
+    monkeypatch.setattr(telefone, '_obter_pool', lambda workers: pool)
+
+    normalizados = telefone.normalizar_telefones(['11987654321', 'abc'], workers=2)
+
+    assert normalizados == {'11987654321': '+5511987654321', 'abc': None}
+    assert pool.shards == []